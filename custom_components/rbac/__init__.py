@@ -1,12 +1,22 @@
 """RBAC Middleware for Home Assistant."""
+import asyncio
+import copy
 import logging
 import os
+import sys
 from typing import Any, Dict, Optional
 from datetime import datetime
 
 import yaml
 
-from homeassistant.core import HomeAssistant
+try:
+    from yaml import CSafeDumper as _YAMLDumper, CSafeLoader as _YAMLLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YAMLDumper, SafeLoader as _YAMLLoader
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED
+from homeassistant.components import persistent_notification
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.components.sensor import SensorEntity
@@ -19,6 +29,25 @@ DOMAIN = "rbac"
 
 CONFIG_SCHEMA = cv.empty_config_schema(DOMAIN)
 
+# Denial notifications are coalesced and flushed after this delay (seconds)
+# or as soon as this many messages are queued, whichever comes first.
+NOTIFICATION_FLUSH_DELAY = 0.1
+NOTIFICATION_FLUSH_THRESHOLD = 5
+NOTIFICATION_TITLE_DENIED = "RBAC Access Denied"
+
+# Roles granting top-level (user management) access
+TOP_LEVEL_ROLES = frozenset({"admin", "super_admin"})
+
+# Configuration changes made through the user management helpers are
+# written to disk at most this many seconds after a change
+SAVE_DELAY = 0.2
+
+# Domains whose service calls are never subject to RBAC enforcement
+EXCLUDED_DOMAINS = frozenset({"http", "auth", "system_log", "persistent_notification"})
+
+# Runtime fields kept in memory but left out of writes from the config editor
+RUNTIME_FIELDS = ("last_rejection", "last_user_rejected")
+
 
 class RBACConfigURLSensor(SensorEntity):
     """Sensor for RBAC configuration URL."""
@@ -32,16 +61,77 @@ class RBACConfigURLSensor(SensorEntity):
         self._attr_native_value = f"{base_url}/api/rbac/static/config.html" if base_url else "/api/rbac/static/config.html"
 
 
+def _dict_or_empty(value: Any) -> Dict[str, Any]:
+    """Return the mapping, treating an empty YAML value (None) as {}."""
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return value
+    raise ValueError(f"expected a mapping, got {type(value).__name__}")
+
+
+def _normalize_restrictions(restrictions: Any) -> None:
+    """Replace empty ``domains``/``entities`` sections with {} in place."""
+    if not isinstance(restrictions, dict):
+        return
+    for key in ("domains", "entities"):
+        if key in restrictions:
+            restrictions[key] = _dict_or_empty(restrictions[key])
+
+
+def _normalize_access_config(config: Dict[str, Any]) -> None:
+    """Normalize restriction sections and intern role names before publishing.
+    
+    A bare ``domains:`` key in YAML loads as None, which the access checks
+    would otherwise have to guard against on every service call. Raises
+    ValueError when a section is not a mapping.
+    """
+    _normalize_restrictions(config.get("default_restrictions"))
+    users = _dict_or_empty(config.get("users"))
+    if "users" in config:
+        config["users"] = users
+    for user_config in users.values():
+        if isinstance(user_config, dict):
+            _normalize_restrictions(user_config.get("restrictions"))
+            # Users then share the role name string of the roles mapping, so
+            # role lookups match by identity before falling back to equality
+            role = user_config.get("role")
+            if isinstance(role, str):
+                user_config["role"] = sys.intern(role)
+    roles = _dict_or_empty(config.get("roles"))
+    for role_config in roles.values():
+        if isinstance(role_config, dict):
+            _normalize_restrictions(role_config.get("permissions"))
+    if "roles" in config:
+        config["roles"] = {
+            sys.intern(name) if isinstance(name, str) else name: role_config
+            for name, role_config in roles.items()
+        }
+
+
+def _dump_yaml(data: Any, stream=None):
+    """Dump data in the layout of the access control file.
+    
+    Returns the YAML text when no stream is given.
+    """
+    return yaml.dump(data, stream, Dumper=_YAMLDumper, default_flow_style=False, indent=2, sort_keys=False)
+
+
+def _access_control_config_path(hass: HomeAssistant) -> str:
+    """Return the path of the access control YAML file."""
+    return os.path.join(hass.config.config_dir, "custom_components", "rbac", "access_control.yaml")
+
+
 async def _load_access_control_config(hass: HomeAssistant) -> Dict[str, Any]:
     """Load access control configuration from YAML file."""
-    config_path = os.path.join(hass.config.config_dir, "custom_components", "rbac", "access_control.yaml")
+    config_path = _access_control_config_path(hass)
     
     def _load_file():
         try:
             with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=_YAMLLoader)
         except FileNotFoundError:
-            _LOGGER.info(f"Access control configuration not found at {config_path}, creating default configuration")
+            _LOGGER.info("Access control configuration not found at %s, creating default configuration", config_path)
             default_config = {
                 "version": "2.0",
                 "description": "RBAC Access Control Configuration",
@@ -81,19 +171,25 @@ async def _load_access_control_config(hass: HomeAssistant) -> Dict[str, Any]:
             os.makedirs(os.path.dirname(config_path), exist_ok=True)
             
             with open(config_path, 'w') as f:
-                yaml.dump(default_config, f, default_flow_style=False, indent=2, sort_keys=False)
+                _dump_yaml(default_config, f)
             
-            _LOGGER.info(f"Created default access control configuration at {config_path}")
+            _LOGGER.info("Created default access control configuration at %s", config_path)
             return default_config
         except yaml.YAMLError as e:
-            _LOGGER.error(f"Invalid YAML in access control configuration: {e}")
+            _LOGGER.error("Invalid YAML in access control configuration: %s", e)
             return {"default_access": "allow", "users": {}}
         except Exception as e:
-            _LOGGER.error(f"Error loading access control configuration: {e}")
+            _LOGGER.error("Error loading access control configuration: %s", e)
             return {"default_access": "allow", "users": {}}
     
     config = await hass.async_add_executor_job(_load_file)
-    _LOGGER.info(f"Loaded access control configuration from {config_path}")
+    if isinstance(config, dict):
+        try:
+            _normalize_access_config(config)
+        except ValueError as e:
+            _LOGGER.error("Invalid restriction section in access control configuration: %s", e)
+        hass.data.setdefault(DOMAIN, {})["saved_config"] = copy.deepcopy(config)
+    _LOGGER.info("Loaded access control configuration from %s", config_path)
     return config
 
 
@@ -103,15 +199,25 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     
     access_config = await _load_access_control_config(hass)
     
-    hass.data[DOMAIN] = {
-        "access_config": access_config,
-        "original_async_call": None
-    }
-    
-    hass.data[DOMAIN]["original_async_call"] = hass.services.async_call
+    # Update the bucket in place so references held by platforms stay valid
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    _set_access_config(hass, access_config)
+    domain_data.setdefault("save_lock", asyncio.Lock())
+    domain_data["original_async_call"] = hass.services.async_call
     
     _patch_service_registry(hass)
     
+    async def _async_flush_pending_save(event: Event) -> None:
+        """Write a pending configuration change before shutdown."""
+        if domain_data.get("runtime_dirty"):
+            _schedule_save(hass)
+        task = _flush_save(hass)
+        if task:
+            await task
+    
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_flush_pending_save)
+    _async_track_person_changes(hass)
+    
     from . import services
     await services.async_setup_services(hass)
     
@@ -120,7 +226,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     _LOGGER.info("Skipping device setup for YAML-only configuration")
     
     user_count = len(access_config.get("users", {}))
-    _LOGGER.info(f"RBAC Middleware initialized successfully with {user_count} configured users")
+    _LOGGER.info("RBAC Middleware initialized successfully with %s configured users", user_count)
     
     from .services import RBACConfigView, RBACUsersView, RBACDomainsView, RBACEntitiesView, RBACServicesView, RBACCurrentUserView, RBACSensorsView, RBACDenyLogView, RBACTemplateEvaluateView, RBACFrontendBlockingView, RBACYamlEditorView
     
@@ -170,7 +276,7 @@ async def async_update_options(hass: HomeAssistant, entry) -> None:
             await async_remove_panel(hass, "rbac-config")
             _LOGGER.info("RBAC sidebar panel removed due to option change")
         except Exception as e:
-            _LOGGER.debug(f"Could not remove RBAC sidebar panel: {e}")
+            _LOGGER.debug("Could not remove RBAC sidebar panel: %s", e)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
@@ -182,12 +288,22 @@ async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
         await async_remove_panel(hass, "rbac-config")
         _LOGGER.info("Successfully removed RBAC sidebar panel")
     except Exception as e:
-        _LOGGER.debug(f"Could not remove RBAC sidebar panel: {e}")
+        _LOGGER.debug("Could not remove RBAC sidebar panel: %s", e)
     
     try:
         await hass.config_entries.async_forward_entry_unload(entry, "sensor")
     except Exception as e:
-        _LOGGER.debug(f"Could not unload sensor platform: {e}")
+        _LOGGER.debug("Could not unload sensor platform: %s", e)
+    
+    # Drop the bus listeners so that a later setup registers them afresh
+    domain_data = hass.data.get(DOMAIN, {})
+    unsubs = domain_data.pop("listing_cache_unsubs", [])
+    if "person_tracker_unsub" in domain_data:
+        unsubs.append(domain_data.pop("person_tracker_unsub"))
+        # Untracked from here on, so _get_person_index() scans live states
+        domain_data.pop("person_index", None)
+    for unsub in unsubs:
+        unsub()
     
     return True
 
@@ -214,10 +330,10 @@ async def _setup_rbac_device(hass: HomeAssistant, config_entry):
         from homeassistant.config_entries import ConfigEntry
         await hass.config_entries.async_forward_entry_setups(config_entry, ["sensor"])
         
-        _LOGGER.info(f"Created RBAC device {device.id} and loaded sensor platform")
+        _LOGGER.info("Created RBAC device %s and loaded sensor platform", device.id)
         
     except Exception as e:
-        _LOGGER.warning(f"Could not create device/sensors properly: {e}")
+        _LOGGER.warning("Could not create device/sensors properly: %s", e)
 
 
 def _patch_service_registry(hass: HomeAssistant):
@@ -235,68 +351,58 @@ def _patch_service_registry(hass: HomeAssistant):
         async def async_call(self, domain, service, service_data=None, blocking=False, context=None, **kwargs):
             """Intercept service calls for RBAC enforcement."""
             try:
-                access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-                allow_chained_actions = access_config.get("allow_chained_actions", False)
+                # The domain bucket exists for as long as the registry is patched
+                domain_data = self._hass.data[DOMAIN]
+                allow_chained_actions = domain_data["access_config"].get("allow_chained_actions", False)
                 
                 if allow_chained_actions and context:
-                    if 'allowed_contexts' not in self._hass.data[DOMAIN]:
-                        self._hass.data[DOMAIN]['allowed_contexts'] = set()
-                    
-                    allowed_contexts = self._hass.data[DOMAIN]['allowed_contexts']
-                    
-                    context_chain = []
-                    if hasattr(context, 'id') and context.id:
-                        context_chain.append(context.id)
-                    if hasattr(context, 'parent_id') and context.parent_id:
-                        context_chain.append(context.parent_id)
+                    allowed_contexts = domain_data.setdefault('allowed_contexts', set())
                     
-                    for ctx_id in context_chain:
-                        if ctx_id in allowed_contexts:
-                            _LOGGER.debug(f"Allowing chained action {domain}.{service} from allowed context {ctx_id}")
+                    for ctx_id in (getattr(context, 'id', None), getattr(context, 'parent_id', None)):
+                        if ctx_id and ctx_id in allowed_contexts:
+                            _LOGGER.debug("Allowing chained action %s.%s from allowed context %s", domain, service, ctx_id)
                             return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
                 
-                excluded_domains = ['http', 'auth', 'system_log', 'persistent_notification']
-                if domain in excluded_domains:
-                    _LOGGER.warning(f"Skipping RBAC enforcement for {domain}.{service} (excluded domain)")
+                if domain in EXCLUDED_DOMAINS:
+                    _LOGGER.debug("Skipping RBAC enforcement for %s.%s (excluded domain)", domain, service)
                     return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
                 
                 user = None
-                user_id = None
-                
-                if context and hasattr(context, 'user_id') and context.user_id:
-                    user = await self._hass.auth.async_get_user(context.user_id)
-                    user_id = context.user_id
-                    _LOGGER.warning(f"Got user from context: {user_id} ({user.name if user else 'Unknown'})")
-                else:
-                    user_id = None
+                user_id = context.user_id if context and hasattr(context, 'user_id') else None
                 
+                # The built-in check only needs the id; skip the auth lookup for those users
                 if user_id and _is_builtin_ha_user(user_id, self._hass):
-                    _LOGGER.warning(f"Skipping RBAC enforcement for built-in HA user: {user_id} ({user.name if user else 'Unknown'})")
+                    _LOGGER.debug("Skipping RBAC enforcement for built-in HA user: %s", user_id)
                     return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
                 
+                if user_id:
+                    user = await self._hass.auth.async_get_user(user_id)
+                    _LOGGER.debug("Got user from context: %s (%s)", user_id, user.name if user else 'Unknown')
+                
                 user_name = user.name if user else "Unknown"
-                _LOGGER.warning(f"RBAC checking service call: {domain}.{service} by {user_name} (user_id: {user_id})")
+                _LOGGER.debug("RBAC checking service call: %s.%s by %s (user_id: %s)", domain, service, user_name, user_id)
                 
                 if not user_id or user_id == "null" or user_id is None:
-                    _LOGGER.debug(f"No user context for {domain}.{service} - allowing call to proceed (likely automation/script)")
+                    _LOGGER.debug("No user context for %s.%s - allowing call to proceed (likely automation/script)", domain, service)
                     return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
                 
-                access_config = self._hass.data[DOMAIN]["access_config"]
+                # Re-read after the auth lookup above, the configuration may have changed
+                access_config = domain_data["access_config"]
                 
                 rbac_enabled = access_config.get("enabled", True)
                 
                 if not rbac_enabled:
-                    _LOGGER.warning(f"RBAC is disabled - allowing all service calls")
+                    _LOGGER.debug("RBAC is disabled - allowing all service calls")
                     return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
                 
                 if rbac_enabled:
-                    _LOGGER.warning(f"Access config for {user_name}: {access_config}")
+                    _LOGGER.debug("Access config for %s: %s", user_name, access_config)
                     
                     access_result, reason = _check_service_access_with_reason(domain, service, service_data, user_id, access_config, self._hass)
                     
                     if not access_result and service_data and "entity_id" in service_data:
-                        _LOGGER.warning(f"Access check result for {user_name}: {access_result}, reason: {reason}")
-                        _LOGGER.warning(f"Service data: {service_data}")
+                        _LOGGER.debug("Access check result for %s: %s, reason: %s", user_name, access_result, reason)
+                        _LOGGER.debug("Service data: %s", service_data)
                     
                     if not access_result:
                         if service_data and "entity_id" in service_data:
@@ -308,32 +414,26 @@ def _patch_service_registry(hass: HomeAssistant):
                                     user_role = user_config.get("role", "unknown")
                             
                             _LOGGER.warning(
-                                f"Access denied: {user_name} cannot call {domain}.{service} from role '{user_role}' - {reason}"
+                                "Access denied: %s cannot call %s.%s from role '%s' - %s",
+                                user_name, domain, service, user_role, reason
                             )
                         else:
-                            _LOGGER.debug(f"Access denied for {user_name} calling {domain}.{service} (no entity_id) - {reason}")
+                            _LOGGER.debug("Access denied for %s calling %s.%s (no entity_id) - %s", user_name, domain, service, reason)
                         
                         if service_data and "entity_id" in service_data:
                             try:
                                 from .services import _update_rejection_sensors
-                                _update_rejection_sensors(hass, user_id, f"{domain}.{service}")
+                                _update_rejection_sensors(hass, user_id, f"{domain}.{service}", user)
                             except Exception as e:
-                                _LOGGER.error(f"Error updating rejection sensors: {e}")
+                                _LOGGER.error("Error updating rejection sensors: %s", e)
                             
                             if access_config.get("show_notifications", True):
-                                try:
-                                    await self._original.async_call(
-                                        "persistent_notification",
-                                        "create",
-                                        {
-                                            "message": f"Access denied: {user_name} cannot call {domain}.{service} from role '{user_role}'",
-                                            "title": "RBAC Access Denied",
-                                            "notification_id": f"rbac_denied_{domain}_{service}"
-                                        }
-                                    )
-                                except Exception as e:
-                                    _LOGGER.error(f"Failed to create notification: {e}")
-                                    _LOGGER.debug(f"Notification error details: {e}", exc_info=True)
+                                _queue_notification(
+                                    self._hass,
+                                    f"rbac_denied_{domain}_{service}",
+                                    NOTIFICATION_TITLE_DENIED,
+                                    f"Access denied: {user_name} cannot call {domain}.{service} from role '{user_role}'"
+                                )
                             
                             if access_config.get("send_event", False):
                                 try:
@@ -346,9 +446,9 @@ def _patch_service_registry(hass: HomeAssistant):
                                         "reason": reason
                                     }
                                     self._hass.bus.async_fire("rbac_access_denied", event_data)
-                                    _LOGGER.debug(f"Fired rbac_access_denied event: {event_data}")
+                                    _LOGGER.debug("Fired rbac_access_denied event: %s", event_data)
                                 except Exception as e:
-                                    _LOGGER.error(f"Failed to send event: {e}")
+                                    _LOGGER.error("Failed to send event: %s", e)
                         
                         user_role = "unknown"
                         if user_id:
@@ -361,34 +461,31 @@ def _patch_service_registry(hass: HomeAssistant):
                             try:
                                 _log_denial_to_file(self._hass, user_id or "unknown", user_name, user_role, domain, service, reason)
                             except Exception as log_error:
-                                _LOGGER.error(f"Failed to log denial: {log_error}")
+                                _LOGGER.error("Failed to log denial: %s", log_error)
                         
                         raise HomeAssistantError(
                             f"Access denied: {user_name} cannot call {domain}.{service} from role '{user_role}' - {reason}"
                         )
                 
                 if rbac_enabled:
-                    _LOGGER.debug(f"Service call allowed: {domain}.{service} by {user_name}")
+                    _LOGGER.debug("Service call allowed: %s.%s by %s", domain, service, user_name)
                 else:
-                    _LOGGER.debug(f"Service call allowed (blocking disabled): {domain}.{service} by {user_name}")
+                    _LOGGER.debug("Service call allowed (blocking disabled): %s.%s by %s", domain, service, user_name)
                 
                 context_id_added = None
                 if allow_chained_actions and context:
-                    if 'allowed_contexts' not in self._hass.data[DOMAIN]:
-                        self._hass.data[DOMAIN]['allowed_contexts'] = set()
-                    
                     if hasattr(context, 'id') and context.id:
-                        self._hass.data[DOMAIN]['allowed_contexts'].add(context.id)
+                        domain_data.setdefault('allowed_contexts', set()).add(context.id)
                         context_id_added = context.id
-                        _LOGGER.debug(f"Added context {context.id} to allowed contexts for {domain}.{service}")
+                        _LOGGER.debug("Added context %s to allowed contexts for %s.%s", context.id, domain, service)
                 
                 try:
                     return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
                 finally:
                     if context_id_added:
                         try:
-                            self._hass.data[DOMAIN]['allowed_contexts'].discard(context_id_added)
-                            _LOGGER.debug(f"Removed context {context_id_added} from allowed contexts for {domain}.{service}")
+                            domain_data['allowed_contexts'].discard(context_id_added)
+                            _LOGGER.debug("Removed context %s from allowed contexts for %s.%s", context_id_added, domain, service)
                         except (KeyError, AttributeError):
                             pass
                 
@@ -396,20 +493,20 @@ def _patch_service_registry(hass: HomeAssistant):
                 raise
             except Exception as e:
                 _LOGGER.warning(
-                    f"RBAC error for {domain}.{service}: {e}. Allowing service call to proceed."
+                    "RBAC error for %s.%s: %s. Allowing service call to proceed.", domain, service, e
                 )
-                _LOGGER.debug(f"RBAC error details: {e}", exc_info=True)
+                _LOGGER.debug("RBAC error details: %s", e, exc_info=True)
                 
                 try:
                     if service_data and isinstance(service_data, dict):
                         cleaned_data = service_data.copy()
                         for key in ['rgb_color', 'xy_color', 'hs_color', 'color_temp']:
                             if key in cleaned_data and not isinstance(cleaned_data[key], (list, tuple)):
-                                _LOGGER.debug(f"Removing invalid {key} from service_data: {cleaned_data[key]}")
+                                _LOGGER.debug("Removing invalid %s from service_data: %s", key, cleaned_data[key])
                                 del cleaned_data[key]
                         service_data = cleaned_data
                 except Exception as cleanup_error:
-                    _LOGGER.debug(f"Failed to clean service_data: {cleanup_error}")
+                    _LOGGER.debug("Failed to clean service_data: %s", cleanup_error)
                 
                 return await self._original.async_call(domain, service, service_data, blocking, context, **kwargs)
     
@@ -460,12 +557,12 @@ def _patch_service_list(hass: HomeAssistant):
                     if not _is_service_restricted_for_user(domain, service_name, user_id, hass):
                         filtered_services[service_name] = service_info
                     else:
-                        _LOGGER.debug(f"Filtering out restricted service {domain}.{service_name} for user {user_id}")
+                        _LOGGER.debug("Filtering out restricted service %s.%s for user %s", domain, service_name, user_id)
                 
                 return filtered_services
             except Exception as e:
-                _LOGGER.warning(f"RBAC error in services.services_for_domain({domain}): {e}. Showing all services to prevent lockout.")
-                _LOGGER.debug(f"RBAC error details: {e}", exc_info=True)
+                _LOGGER.warning("RBAC error in services.services_for_domain(%s): %s. Showing all services to prevent lockout.", domain, e)
+                _LOGGER.debug("RBAC error details: %s", e, exc_info=True)
                 return self._original.services_for_domain(domain)
         
         def async_services(self):
@@ -492,15 +589,15 @@ def _patch_service_list(hass: HomeAssistant):
                         if not _is_service_restricted_for_user(domain, service_name, user_id, hass):
                             filtered_domain_services[service_name] = service_info
                         else:
-                            _LOGGER.debug(f"Filtering out restricted service {domain}.{service_name} for user {user_id}")
+                            _LOGGER.debug("Filtering out restricted service %s.%s for user %s", domain, service_name, user_id)
                     
                     if filtered_domain_services:
                         filtered_services[domain] = filtered_domain_services
                 
                 return filtered_services
             except Exception as e:
-                _LOGGER.warning(f"RBAC error in services.async_services(): {e}. Showing all services to prevent lockout.")
-                _LOGGER.debug(f"RBAC error details: {e}", exc_info=True)
+                _LOGGER.warning("RBAC error in services.async_services(): %s. Showing all services to prevent lockout.", e)
+                _LOGGER.debug("RBAC error details: %s", e, exc_info=True)
                 return self._original.async_services()
     
     hass.services = FilteredServiceRegistry(original_registry, hass)
@@ -553,14 +650,68 @@ def _is_builtin_ha_user(user_id: str, hass: HomeAssistant = None) -> bool:
         # Fallback to name-based checking if hass is not available
         return False
     
-    all_states = hass.states.async_all()
-    for state in all_states:
-        if state.entity_id.startswith('person.'):
-            if hasattr(state, 'attributes') and 'user_id' in state.attributes:
-                if state.attributes['user_id'] == user_id:
-                    return False
+    return user_id not in _get_person_index(hass)
+
+
+def _get_person_index(hass: HomeAssistant) -> Dict[str, Any]:
+    """Map the ids of users linked to a person entity to that entity's state.
+    
+    Built on first use and then kept current by _async_track_person_changes().
+    The index is only cached while that tracker is registered; without it,
+    every call scans the person entities afresh.
+    """
+    domain_data = hass.data[DOMAIN]
+    person_index = domain_data.get("person_index")
+    if person_index is None:
+        person_index = {}
+        for state in hass.states.async_all("person"):
+            user_id = state.attributes.get("user_id")
+            if user_id:
+                person_index.setdefault(user_id, state)
+        if "person_tracker_unsub" in domain_data:
+            domain_data["person_index"] = person_index
+    return person_index
+
+
+@callback
+def _async_track_person_changes(hass: HomeAssistant) -> None:
+    """Keep the person index current as person entities change.
+    
+    Setup may run more than once; the listener is only registered once.
+    """
+    domain_data = hass.data[DOMAIN]
+    if "person_tracker_unsub" in domain_data:
+        return
     
-    return True
+    @callback
+    def _is_person_change(event_data) -> bool:
+        return event_data["entity_id"].startswith("person.")
+    
+    @callback
+    def _update_person_index(event) -> None:
+        domain_data = hass.data[DOMAIN]
+        person_index = domain_data.get("person_index")
+        if person_index is None:
+            return
+        old_state = event.data["old_state"]
+        new_state = event.data["new_state"]
+        old_user_id = old_state.attributes.get("user_id") if old_state else None
+        new_user_id = new_state.attributes.get("user_id") if new_state else None
+        
+        if old_user_id and old_user_id != new_user_id:
+            # The user may also be linked to another person; rebuild on next use
+            domain_data.pop("person_index", None)
+            return
+        if new_user_id:
+            current = person_index.get(new_user_id)
+            if current is None or current.entity_id == new_state.entity_id:
+                person_index[new_user_id] = new_state
+    
+    # An index built while untracked may be stale
+    domain_data.pop("person_index", None)
+    domain_data["person_tracker_unsub"] = hass.bus.async_listen(
+        EVENT_STATE_CHANGED, _update_person_index, event_filter=_is_person_change
+    )
 
 
 def _check_service_access_with_reason(
@@ -580,18 +731,18 @@ def _check_service_access_with_reason(
     user_config = users.get(user_id)
     
     if not user_config:
-        _LOGGER.warning(f"User {user_id} not in config, checking default restrictions")
+        _LOGGER.debug("User %s not in config, checking default restrictions", user_id)
         default_restrictions = access_config.get("default_restrictions", {})
-        _LOGGER.warning(f"Default restrictions: {default_restrictions}")
+        _LOGGER.debug("Default restrictions: %s", default_restrictions)
         if default_restrictions:
             default_domains = default_restrictions.get("domains", {})
-            _LOGGER.warning(f"Checking domain {domain} against default domains: {default_domains}")
+            _LOGGER.debug("Checking domain %s against default domains: %s", domain, default_domains)
             if domain in default_domains:
                 domain_config = default_domains[domain]
-                _LOGGER.warning(f"Found domain {domain} config: {domain_config}")
+                _LOGGER.debug("Found domain %s config: %s", domain, domain_config)
                 default_services = domain_config.get("services", [])
                 if not default_services:
-                    _LOGGER.warning(f"Domain {domain} blocks all services")
+                    _LOGGER.debug("Domain %s blocks all services", domain)
                     return False, f"domain {domain} blocked by default"
                 elif service in default_services:
                     return False, f"service {domain}.{service} blocked by default"
@@ -633,46 +784,39 @@ def _check_service_access_with_reason(
             try:
                 template = Template(template_str, hass)
                 
-                user_person_entity = None
-                try:
-                    for state in hass.states.async_all():
-                        if state.domain == "person" and state.attributes.get("user_id") == user_id:
-                            user_person_entity = state.entity_id
-                            break
-                except Exception as e:
-                    _LOGGER.debug(f"Could not find person entity for user {user_id}: {e}")
+                person_state = _get_person_index(hass).get(user_id)
                 
                 template_context = {}
-                if user_person_entity:
-                    template_context['current_user_str'] = user_person_entity
+                if person_state:
+                    template_context['current_user_str'] = person_state.entity_id
                 
                 result = template.async_render(template_context, parse_result=False)
                 
                 template_result = bool(result) if result not in [None, "", "False", "false", "0"] else False
                 
-                _LOGGER.debug(f"Template for role {user_role} evaluated to: {template_result} (raw: {result})")
+                _LOGGER.debug("Template for role %s evaluated to: %s (raw: %s)", user_role, template_result, result)
                 
                 if not template_result:
-                    _LOGGER.info(f"Template for role {user_role} evaluated to false, switching to fallback role: {fallback_role}")
+                    _LOGGER.info("Template for role %s evaluated to false, switching to fallback role: %s", user_role, fallback_role)
                     user_role = fallback_role
                     role_config = roles.get(user_role, {})
                     
                     if not role_config:
-                        _LOGGER.warning(f"Fallback role {fallback_role} not found in configuration")
+                        _LOGGER.warning("Fallback role %s not found in configuration", fallback_role)
                         return True, f"fallback role {fallback_role} not found"
             except Exception as e:
-                _LOGGER.error(f"Error evaluating template for role {user_role}: {e}")
-                _LOGGER.debug(f"Template evaluation error details: {e}", exc_info=True)
+                _LOGGER.error("Error evaluating template for role %s: %s", user_role, e)
+                _LOGGER.debug("Template evaluation error details: %s", e, exc_info=True)
                 if fallback_role:
-                    _LOGGER.warning(f"Template evaluation failed for role {user_role}, switching to fallback role: {fallback_role}")
+                    _LOGGER.warning("Template evaluation failed for role %s, switching to fallback role: %s", user_role, fallback_role)
                     user_role = fallback_role
                     role_config = roles.get(user_role, {})
                     
                     if not role_config:
-                        _LOGGER.warning(f"Fallback role {fallback_role} not found in configuration")
+                        _LOGGER.warning("Fallback role %s not found in configuration", fallback_role)
                         return True, f"fallback role {fallback_role} not found"
                 else:
-                    _LOGGER.error(f"No fallback role defined for role {user_role}, continuing with original role")
+                    _LOGGER.error("No fallback role defined for role %s, continuing with original role", user_role)
     
     if not role_config:
         return True, f"no role configuration for {user_role}"
@@ -752,7 +896,7 @@ def _check_service_access_with_reason(
                     role_entity_services = role_entity_config.get("services", [])
                     role_entity_allow = role_entity_config.get("allow", False)
                     
-                    _LOGGER.warning(f"Found entity {eid} in role permissions: allow={role_entity_allow}, services={role_entity_services}")
+                    _LOGGER.debug("Found entity %s in role permissions: allow=%s, services=%s", eid, role_entity_allow, role_entity_services)
                     
                     if role_entity_allow:
                         # Role allow rule: check if service is in allowed services
@@ -828,7 +972,7 @@ def _check_service_access_with_reason(
                 role_entity_services = role_entity_config.get("services", [])
                 role_entity_allow = role_entity_config.get("allow", False)
                 
-                _LOGGER.warning(f"Found single entity {entity_id} in role permissions: allow={role_entity_allow}, services={role_entity_services}")
+                _LOGGER.debug("Found single entity %s in role permissions: allow=%s, services=%s", entity_id, role_entity_allow, role_entity_services)
                 
                 if role_entity_allow:
                     # Role allow rule: check if service is in allowed services
@@ -895,7 +1039,7 @@ def _check_service_access_with_reason(
         role_services = role_config.get("services", [])
         role_allow = role_config.get("allow", False)
         
-        _LOGGER.warning(f"Found domain {domain} in role permissions: allow={role_allow}, services={role_services}")
+        _LOGGER.debug("Found domain %s in role permissions: allow=%s, services=%s", domain, role_allow, role_services)
         
         if role_allow:
             if not role_services or service in role_services:
@@ -909,18 +1053,17 @@ def _check_service_access_with_reason(
                 return False, f"service {domain}.{service} blocked by role {user_role}"
     
     if deny_all and not ((domain == "system_log" and service == "write") or (domain == "browser_mod" and service == "notification")):
-        entity_ids = []
-        
-        if service_data and "entity_id" in service_data:
-            entity_id = service_data["entity_id"]
-            if isinstance(entity_id, str):
-                entity_ids = [entity_id]
-            else:
-                entity_ids = entity_id if isinstance(entity_id, list) else []
-        
+        entity_id = service_data.get("entity_id") if service_data else None
+        # Normalize once into a fresh list so the caller's service data is never mutated
+        if isinstance(entity_id, str):
+            entity_ids = [entity_id]
+        elif isinstance(entity_id, list):
+            entity_ids = list(entity_id)
+        else:
+            entity_ids = []
+
         if domain in ["script", "automation"]:
-            entity_name = f"{domain}.{service}"
-            entity_ids.append(entity_name)
+            entity_ids.append(f"{domain}.{service}")
         
         role_entities = permissions.get("entities", {})
         for eid in entity_ids:
@@ -1038,75 +1181,262 @@ def get_user_config(hass: HomeAssistant, user_id: str) -> Optional[Dict[str, Any
     return users.get(user_id)
 
 
+def _set_access_config(hass: HomeAssistant, access_config: Dict[str, Any]) -> None:
+    """Store the access control configuration and bump its version.
+    
+    Readers caching values derived from the configuration compare versions
+    to know when to refresh them. After mutating the stored configuration in
+    place, call _bump_config_version() instead.
+    """
+    hass.data[DOMAIN]["access_config"] = access_config
+    _bump_config_version(hass)
+
+
+def _bump_config_version(hass: HomeAssistant) -> None:
+    """Mark the stored access control configuration as changed in place."""
+    domain_data = hass.data[DOMAIN]
+    domain_data["config_version"] = domain_data.get("config_version", 0) + 1
+
+
+def _set_runtime_fields(hass: HomeAssistant, values: Dict[str, Any]) -> None:
+    """Update RUNTIME_FIELDS of the stored configuration in place.
+    
+    These fields never affect access decisions, so the config version is
+    left alone and the caches keyed on it stay valid. Readers exposing the
+    fields also compare runtime_version. The fields reach disk with the next
+    debounced write, or at shutdown.
+    """
+    domain_data = hass.data[DOMAIN]
+    domain_data["access_config"].update(values)
+    domain_data["runtime_version"] = domain_data.get("runtime_version", 0) + 1
+    domain_data["runtime_dirty"] = True
+
+
+def _restore_saved_config(hass: HomeAssistant) -> None:
+    """Publish the configuration last read from or written to disk again.
+    
+    The current RUNTIME_FIELDS are carried over, since they were never part
+    of the edit being undone.
+    """
+    domain_data = hass.data[DOMAIN]
+    restored = copy.deepcopy(domain_data["saved_config"])
+    live_config = domain_data["access_config"]
+    for key in RUNTIME_FIELDS:
+        if key in live_config:
+            restored[key] = live_config[key]
+    _set_access_config(hass, restored)
+
+
 async def reload_access_config(hass: HomeAssistant) -> bool:
     """Reload the access control configuration from YAML file."""
     try:
         access_config = await _load_access_control_config(hass)
-        hass.data[DOMAIN]["access_config"] = access_config
+        _set_access_config(hass, access_config)
         _LOGGER.info("Access control configuration reloaded successfully")
         return True
     except Exception as e:
-        _LOGGER.error(f"Failed to reload access control configuration: {e}")
+        _LOGGER.error("Failed to reload access control configuration: %s", e)
         return False
 
 
+@callback
 def _is_top_level_user(hass: HomeAssistant, user_id: str) -> bool:
-    """Check if user has top-level access (admin or super_admin role)."""
+    """Check if user has top-level access (admin or super_admin role).
+    
+    Answered from a set of top-level ids rebuilt when the access config
+    version changes. Users without RBAC configuration never have top-level
+    access, whatever their Home Assistant admin flag.
+    """
     if DOMAIN not in hass.data:
         return False
     
-    access_config = hass.data[DOMAIN].get("access_config", {})
-    users = access_config.get("users", {})
-    user_config = users.get(user_id)
+    return user_id in _get_top_level_ids(hass)
+
+
+def _get_top_level_ids(hass: HomeAssistant) -> frozenset:
+    """Return the ids of configured users with a top-level role."""
+    domain_data = hass.data[DOMAIN]
+    version = domain_data.get("config_version", 0)
     
-    if not user_config:
-        try:
-            user = hass.auth.async_get_user(user_id)
-            if user and user.is_admin:
-                return True
-        except Exception:
-            pass
-        return False
+    cached = domain_data.get("top_level_ids")
+    if cached and cached[0] == version:
+        return cached[1]
     
-    role = user_config.get("role", "")
-    return role in ["admin", "super_admin"]
+    users = domain_data.get("access_config", {}).get("users", {})
+    top_level_ids = frozenset(
+        user_id
+        for user_id, user_config in users.items()
+        if user_config and user_config.get("role", "") in TOP_LEVEL_ROLES
+    )
+    domain_data["top_level_ids"] = (version, top_level_ids)
+    return top_level_ids
 
 
 async def _save_access_control_config(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
-    """Save access control configuration to YAML file."""
-    config_path = os.path.join(hass.config.config_dir, "custom_components", "rbac", "access_control.yaml")
+    """Save access control configuration to YAML file.
+    
+    The dump runs in the executor while the event loop may keep editing the
+    live configuration, so it works on a snapshot taken here.
+    """
+    config_path = _access_control_config_path(hass)
+    config = copy.deepcopy(config)
     
     def _save_file():
         try:
             with open(config_path, 'w') as f:
-                yaml.dump(config, f, default_flow_style=False, indent=2, sort_keys=False)
+                _dump_yaml(config, f)
             return True
         except Exception as e:
-            _LOGGER.error(f"Error saving access control configuration: {e}")
+            _LOGGER.error("Error saving access control configuration: %s", e)
             return False
     
     success = await hass.async_add_executor_job(_save_file)
     if success:
-        _LOGGER.info(f"Saved access control configuration to {config_path}")
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        # The snapshot is private to this call, so it can be kept as is
+        domain_data["saved_config"] = config
+        # Don't rely on the mtime alone; it may not move within its resolution
+        domain_data.pop("yaml_editor_cache", None)
+        _LOGGER.info("Saved access control configuration to %s", config_path)
     return success
 
 
+@callback
+def _schedule_save(hass: HomeAssistant, delay: float = SAVE_DELAY) -> None:
+    """Write the in-memory configuration after delay, coalescing bursts.
+    
+    A pending write due sooner is kept, so a steady stream of changes
+    cannot postpone the write indefinitely.
+    """
+    domain_data = hass.data[DOMAIN]
+    handle = domain_data.get("save_handle")
+    if handle:
+        if handle.when() <= hass.loop.time() + delay:
+            return
+        handle.cancel()
+    domain_data["save_handle"] = hass.loop.call_later(delay, _flush_save, hass)
+
+
+@callback
+def _cancel_save(hass: HomeAssistant) -> None:
+    """Drop the pending configuration write, if any."""
+    handle = hass.data[DOMAIN].pop("save_handle", None)
+    if handle:
+        handle.cancel()
+
+
+@callback
+def _flush_save(hass: HomeAssistant):
+    """Start the pending configuration write now, returning its task if any."""
+    domain_data = hass.data[DOMAIN]
+    handle = domain_data.pop("save_handle", None)
+    if handle is None:
+        return None
+    handle.cancel()
+    # The whole configuration is written, runtime fields included
+    domain_data.pop("runtime_dirty", None)
+    return hass.async_create_task(
+        _save_access_control_config(hass, domain_data["access_config"])
+    )
+
+
+async def _async_save_config_coalesced(hass: HomeAssistant) -> bool:
+    """Write the in-memory configuration, sharing writes between concurrent callers.
+    
+    The first caller writes immediately. Callers arriving while that write is
+    in flight wait for it and are then all covered by one follow-up write.
+    """
+    domain_data = hass.data[DOMAIN]
+    requested = domain_data["save_requested"] = domain_data.get("save_requested", 0) + 1
+    
+    async with domain_data["save_lock"]:
+        if domain_data.get("save_completed", 0) >= requested:
+            return domain_data["save_result"]
+        
+        generation = domain_data["save_requested"]
+        # This write also covers any debounced change
+        _cancel_save(hass)
+        config_to_save = {
+            key: value
+            for key, value in domain_data["access_config"].items()
+            if key not in RUNTIME_FIELDS
+        }
+        result = await _save_access_control_config(hass, config_to_save)
+        domain_data["save_completed"] = generation
+        domain_data["save_result"] = result
+        return result
+
+
+@callback
+def _queue_notification(hass: HomeAssistant, notification_id: str, title: str, message: str):
+    """Queue a persistent notification, coalescing bursts per notification_id.
+    
+    Distinct messages queued for the same notification_id before the flush
+    are merged into a single notification.
+    """
+    domain_data = hass.data[DOMAIN]
+    pending = domain_data.setdefault("pending_notifications", {})
+    
+    _, messages = pending.setdefault(notification_id, (title, []))
+    if message not in messages:
+        messages.append(message)
+    
+    domain_data["pending_notification_count"] = domain_data.get("pending_notification_count", 0) + 1
+    if domain_data["pending_notification_count"] >= NOTIFICATION_FLUSH_THRESHOLD:
+        _flush_notifications(hass)
+    elif not domain_data.get("notification_flush_handle"):
+        domain_data["notification_flush_handle"] = hass.loop.call_later(
+            NOTIFICATION_FLUSH_DELAY, _flush_notifications, hass
+        )
+
+
+@callback
+def _flush_notifications(hass: HomeAssistant):
+    """Create one persistent notification per queued notification_id."""
+    domain_data = hass.data[DOMAIN]
+    
+    handle = domain_data.pop("notification_flush_handle", None)
+    if handle:
+        handle.cancel()
+    domain_data["pending_notification_count"] = 0
+    pending = domain_data.pop("pending_notifications", {})
+    
+    for notification_id, (title, messages) in pending.items():
+        try:
+            # Direct call: no service dispatch, no task, no trip through RBAC
+            persistent_notification.async_create(
+                hass, "\n---\n".join(messages), title=title, notification_id=notification_id
+            )
+        except Exception as e:
+            _LOGGER.error("Failed to create notification: %s", e)
+            _LOGGER.debug("Notification error details: %s", e, exc_info=True)
+
+
 def _log_denial_to_file(hass: HomeAssistant, user_id: str, user_name: str, user_role: str, domain: str, service: str, reason: str):
-    """Log access denial to deny_list.log file."""
+    """Log access denial to deny_list.log file.
+    
+    The entry is timestamped now; the append runs in the executor without
+    being awaited, so the denial is raised without waiting on disk I/O.
+    """
+    log_path = os.path.join(hass.config.config_dir, "custom_components", "rbac", "deny_list.log")
+    
+    timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+    
+    log_entry = f"[{timestamp}] DENIED - User: {user_name} ({user_id}) | Role: {user_role} | Service: {domain}.{service} | Reason: {reason}\n"
+    
+    hass.async_add_executor_job(_append_deny_log_entry, log_path, log_entry)
+
+
+def _append_deny_log_entry(log_path: str, log_entry: str):
+    """Append one entry to the deny log file (runs in the executor)."""
     try:
-        log_path = os.path.join(hass.config.config_dir, "custom_components", "rbac", "deny_list.log")
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        log_entry = f"[{timestamp}] DENIED - User: {user_name} ({user_id}) | Role: {user_role} | Service: {domain}.{service} | Reason: {reason}\n"
-        
         with open(log_path, 'a', encoding='utf-8') as log_file:
             log_file.write(log_entry)
         
-        _LOGGER.debug(f"Logged denial to deny_list.log: {user_name} -> {domain}.{service}")
+        _LOGGER.debug("Logged denial to deny_list.log: %s", log_entry.rstrip())
         
     except Exception as e:
-        _LOGGER.error(f"Failed to log denial to file: {e}")
+        _LOGGER.error("Failed to log denial to file: %s", e)
 
 
 def _get_deny_log_contents(hass: HomeAssistant) -> str:
@@ -1120,13 +1450,14 @@ def _get_deny_log_contents(hass: HomeAssistant) -> str:
         with open(log_path, 'r', encoding='utf-8') as log_file:
             contents = log_file.read()
         
-        if not contents.strip():
+        # isspace() checks in place instead of copying the whole log like strip()
+        if not contents or contents.isspace():
             return "Deny log file is empty. No access denials have been logged yet."
         
         return contents
         
     except Exception as e:
-        _LOGGER.error(f"Failed to read deny log file: {e}")
+        _LOGGER.error("Failed to read deny log file: %s", e)
         return f"Error reading deny log file: {e}"
 
 
@@ -1142,7 +1473,7 @@ def _clear_deny_log(hass: HomeAssistant) -> bool:
         return True
         
     except Exception as e:
-        _LOGGER.error(f"Failed to clear deny log file: {e}")
+        _LOGGER.error("Failed to clear deny log file: %s", e)
         return False
 
 
@@ -1185,7 +1516,7 @@ async def _register_sidebar_panel(hass: HomeAssistant):
             return True
             
         except Exception as e:
-            _LOGGER.debug(f"Panel registration attempt failed: {e}")
+            _LOGGER.debug("Panel registration attempt failed: %s", e)
             return False
     
     if await _do_panel_registration():
@@ -1206,7 +1537,7 @@ async def _register_sidebar_panel(hass: HomeAssistant):
         hass.bus.async_listen_once("frontend_ready", _on_frontend_ready)
         _LOGGER.info("RBAC panel registration scheduled for when frontend is ready")
     except Exception as e:
-        _LOGGER.warning(f"Could not schedule RBAC panel registration: {e}. Users will need to access the config page manually at /api/rbac/static/config.html")
+        _LOGGER.warning("Could not schedule RBAC panel registration: %s. Users will need to access the config page manually at /api/rbac/static/config.html", e)
 
 
 async def add_user_access(hass: HomeAssistant, user_id: str, role: str) -> bool:
@@ -1215,19 +1546,15 @@ async def add_user_access(hass: HomeAssistant, user_id: str, role: str) -> bool:
         return False
     
     access_config = hass.data[DOMAIN].get("access_config", {})
-    if "users" not in access_config:
-        access_config["users"] = {}
-    
-    access_config["users"][user_id] = {
-        "role": role
+    # Interned like the role names of a loaded configuration
+    access_config.setdefault("users", {})[user_id] = {
+        "role": sys.intern(role)
     }
+    _bump_config_version(hass)
+    _schedule_save(hass)
     
-    if await _save_access_control_config(hass, access_config):
-        hass.data[DOMAIN]["access_config"] = access_config
-        _LOGGER.info(f"Added user '{user_id}' with role '{role}'")
-        return True
-    
-    return False
+    _LOGGER.info("Added user '%s' with role '%s'", user_id, role)
+    return True
 
 
 async def remove_user_access(hass: HomeAssistant, user_id: str) -> bool:
@@ -1238,88 +1565,63 @@ async def remove_user_access(hass: HomeAssistant, user_id: str) -> bool:
     access_config = hass.data[DOMAIN].get("access_config", {})
     users = access_config.get("users", {})
     
-    if user_id in users:
-        del users[user_id]
-        
-        if _save_access_control_config(hass, access_config):
-            hass.data[DOMAIN]["access_config"] = access_config
-            _LOGGER.info(f"Removed user '{user_id}' from access control")
-            return True
+    if user_id not in users:
+        return False
     
-    return False
+    del users[user_id]
+    _bump_config_version(hass)
+    _schedule_save(hass)
+    
+    _LOGGER.info("Removed user '%s' from access control", user_id)
+    return True
 
 
 async def update_user_role(hass: HomeAssistant, user_id: str, role: str) -> bool:
     """Update a user's role in the access control configuration."""
-    if DOMAIN not in hass.data:
+    user_config = get_user_config(hass, user_id)
+    if user_config is None:
         return False
     
-    access_config = hass.data[DOMAIN].get("access_config", {})
-    users = access_config.get("users", {})
-    
-    if user_id in users:
-        users[user_id]["role"] = role
-        
-        if _save_access_control_config(hass, access_config):
-            hass.data[DOMAIN]["access_config"] = access_config
-            _LOGGER.info(f"Updated user '{user_id}' role to '{role}'")
-            return True
+    user_config["role"] = sys.intern(role)
+    _bump_config_version(hass)
+    _schedule_save(hass)
     
-    return False
+    _LOGGER.info("Updated user '%s' role to '%s'", user_id, role)
+    return True
 
 
 async def add_user_restriction(hass: HomeAssistant, user_id: str, domain: str, services: list) -> bool:
     """Add domain restrictions for a user."""
-    if DOMAIN not in hass.data:
+    user_config = get_user_config(hass, user_id)
+    if user_config is None:
         return False
     
-    access_config = hass.data[DOMAIN].get("access_config", {})
-    users = access_config.get("users", {})
-    
-    if user_id not in users:
-        return False
-    
-    user_config = users[user_id]
-    if "restrictions" not in user_config:
-        user_config["restrictions"] = {}
-    if "domains" not in user_config["restrictions"]:
-        user_config["restrictions"]["domains"] = {}
-    
-    user_config["restrictions"]["domains"][domain] = {
+    domains = user_config.setdefault("restrictions", {}).setdefault("domains", {})
+    domains[domain] = {
         "services": services
     }
+    _bump_config_version(hass)
+    _schedule_save(hass)
     
-    if await _save_access_control_config(hass, access_config):
-        hass.data[DOMAIN]["access_config"] = access_config
-        _LOGGER.info(f"Added domain restriction for user '{user_id}': {domain}.{services}")
-        return True
-    
-    return False
+    _LOGGER.info("Added domain restriction for user '%s': %s.%s", user_id, domain, services)
+    return True
 
 
 async def remove_user_restriction(hass: HomeAssistant, user_id: str, domain: str) -> bool:
     """Remove domain restrictions for a user."""
-    if DOMAIN not in hass.data:
+    user_config = get_user_config(hass, user_id)
+    if user_config is None:
         return False
     
-    access_config = hass.data[DOMAIN].get("access_config", {})
-    users = access_config.get("users", {})
-    
-    if user_id not in users:
+    domains = user_config.get("restrictions", {}).get("domains", {})
+    if domain not in domains:
         return False
     
-    user_config = users[user_id]
-    restrictions = user_config.get("restrictions", {})
-    domains = restrictions.get("domains", {})
+    del domains[domain]
+    _bump_config_version(hass)
+    _schedule_save(hass)
     
-    if domain in domains:
-        del domains[domain]
-        
-        if await _save_access_control_config(hass, access_config):
-            hass.data[DOMAIN]["access_config"] = access_config
-            _LOGGER.info(f"Removed domain restriction for user '{user_id}': {domain}")
-            return True
-    
-    return False
+    _LOGGER.info("Removed domain restriction for user '%s': %s", user_id, domain)
+    return True
 
 
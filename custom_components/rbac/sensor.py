@@ -1,13 +1,42 @@
 """RBAC Sensor Platform."""
+from contextlib import suppress
+from dataclasses import dataclass
 import logging
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.core import HomeAssistant
+from typing import Any, Final
+
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import CoreState, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.start import async_at_started
 
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+_CONFIG_PATH: Final = "/api/rbac/static/config.html"
+
+# Shared read-only default for dict lookups; never mutate.
+_EMPTY: Final[dict] = {}
+
+_DEVICE_INFO: Final = {
+    "identifiers": {(DOMAIN, "rbac_middleware")},
+    "name": "RBAC Middleware",
+}
+
+_ICON_WEB: Final = "mdi:web"
+_ICON_SHIELD_ON: Final = "mdi:shield-check"
+_ICON_SHIELD_OFF: Final = "mdi:shield-off"
+_ICON_BELL_ON: Final = "mdi:bell"
+_ICON_BELL_OFF: Final = "mdi:bell-off"
+_ICON_SEND_ON: Final = "mdi:send"
+_ICON_SEND_OFF: Final = "mdi:send-lock"
+_ICON_CLOCK_ALERT: Final = "mdi:clock-alert"
+_ICON_ACCOUNT_ALERT: Final = "mdi:account-alert"
+_ICON_SHIELD_SEARCH: Final = "mdi:shield-search"
+
+_UID_CONFIG_URL: Final = f"{DOMAIN}_config_url"
+
 
 class RBACBaseSensor(SensorEntity):
     """Base class for RBAC sensors."""
@@ -16,146 +45,166 @@ class RBACBaseSensor(SensorEntity):
         """Initialize the sensor."""
         self._hass = hass
         self._device_id = device_id
-        
-    @property
-    def device_info(self):
-        """Return device info."""
-        if self._device_id:
-            return {
-                "identifiers": {(DOMAIN, "rbac_middleware")},
-                "name": "RBAC Middleware",
-            }
-        return None
+        # The integration data bucket keeps its identity for the lifetime of hass
+        self._domain_data = hass.data.setdefault(DOMAIN, {})
+        self._attr_device_info = _DEVICE_INFO if device_id else None
 
 
 class RBACConfigURLSensor(RBACBaseSensor):
-    """RBAC Configuration URL Sensor."""
+    """RBAC Configuration URL Sensor.
+    
+    The URL only changes with the core configuration, so it is recomputed
+    on core config updates, and once startup completes, rather than polled.
+    """
+    
+    _attr_name = "RBAC Configuration URL"
+    _attr_unique_id = _UID_CONFIG_URL
+    _attr_device_class = "url"
+    _attr_icon = _ICON_WEB
+    _attr_should_poll = False
     
     def __init__(self, hass, device_id=None):
         """Initialize the sensor."""
         super().__init__(hass, device_id)
-        self._attr_name = "RBAC Configuration URL"
-        self._attr_unique_id = f"{DOMAIN}_config_url"
-        self._attr_device_class = "url"
-        self._attr_icon = "mdi:web"
+        self._update_from_config()
         
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        base_url = self._hass.config.external_url or self._hass.config.internal_url
+    def _update_from_config(self):
+        """Recompute the configuration URL."""
+        config = self._hass.config
+        base_url = config.external_url or config.internal_url
         if not base_url:
-            base_url = f"http://{self._hass.config.api.host}:{self._hass.config.api.port}"
-        return f"{base_url}/api/rbac/static/config.html"
-
-
-class RBACEnabledSensor(RBACBaseSensor):
-    """RBAC Enabled Status Sensor."""
-    
-    def __init__(self, hass, device_id=None):
-        """Initialize the sensor."""
-        super().__init__(hass, device_id)
-        self._attr_name = "RBAC Enabled"
-        self._attr_unique_id = f"{DOMAIN}_enabled"
-        self._attr_icon = "mdi:shield-check"
+            base_url = ""
+            # config.api is None until the http component has started
+            with suppress(AttributeError):
+                api = config.api
+                base_url = f"http://{api.host}:{api.port}"
+        self._attr_native_value = f"{base_url}{_CONFIG_PATH}"
         
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-        enabled = access_config.get("enabled", True)
-        self._attr_icon = "mdi:shield-check" if enabled else "mdi:shield-off"
-        return "on" if enabled else "off"
-
-
-class RBACShowNotificationsSensor(RBACBaseSensor):
-    """RBAC Show Notifications Sensor."""
-    
-    def __init__(self, hass, device_id=None):
-        """Initialize the sensor."""
-        super().__init__(hass, device_id)
-        self._attr_name = "RBAC Show Notifications"
-        self._attr_unique_id = f"{DOMAIN}_show_notifications"
-        self._attr_icon = "mdi:bell"
+    async def async_added_to_hass(self):
+        """Track core config updates once the sensor is added."""
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, self._handle_core_config_update)
+        )
+        # The http component may have started since __init__
+        self._update_from_config()
+        if self.hass.state is not CoreState.running:
+            self.async_on_remove(async_at_started(self.hass, self._handle_started))
         
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-        show_notifications = access_config.get("show_notifications", True)
-        self._attr_icon = "mdi:bell" if show_notifications else "mdi:bell-off"
-        return "on" if show_notifications else "off"
-
-
-class RBACSendEventsSensor(RBACBaseSensor):
-    """RBAC Send Events Sensor."""
-    
-    def __init__(self, hass, device_id=None):
-        """Initialize the sensor."""
-        super().__init__(hass, device_id)
-        self._attr_name = "RBAC Send Events"
-        self._attr_unique_id = f"{DOMAIN}_send_events"
-        self._attr_icon = "mdi:send"
+    @callback
+    def _handle_core_config_update(self, event):
+        """Recompute the URL after the core configuration changed."""
+        self._update_from_config()
+        self.async_write_ha_state()
         
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-        send_event = access_config.get("send_event", True)
-        self._attr_icon = "mdi:send" if send_event else "mdi:send-lock"
-        return "on" if send_event else "off"
+    @callback
+    def _handle_started(self, hass):
+        """Recompute the URL once Home Assistant, and http, have started."""
+        self._update_from_config()
+        self.async_write_ha_state()
 
 
-class RBACLastRejectionSensor(RBACBaseSensor):
-    """RBAC Last Rejection Sensor."""
+@dataclass(frozen=True, kw_only=True)
+class RBACSensorEntityDescription(SensorEntityDescription):
+    """Describes an RBAC sensor backed by an access control configuration key.
     
-    def __init__(self, hass, device_id=None):
-        """Initialize the sensor."""
-        super().__init__(hass, device_id)
-        self._attr_name = "RBAC Last Rejection"
-        self._attr_unique_id = f"{DOMAIN}_last_rejection"
-        self._attr_icon = "mdi:clock-alert"
-        
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-        return access_config.get("last_rejection", "Never")
-
-
-class RBACLastUserRejectedSensor(RBACBaseSensor):
-    """RBAC Last User Rejected Sensor."""
+    Toggle sensors (those with an ``off_icon``) report "on"/"off" and swap
+    between ``icon`` and ``off_icon``; the others report the raw value.
+    """
     
-    def __init__(self, hass, device_id=None):
-        """Initialize the sensor."""
-        super().__init__(hass, device_id)
-        self._attr_name = "RBAC Last User Rejected"
-        self._attr_unique_id = f"{DOMAIN}_last_user_rejected"
-        self._attr_icon = "mdi:account-alert"
-        
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-        return access_config.get("last_user_rejected", "None")
-
-
-class RBACFrontendBlockingSensor(RBACBaseSensor):
-    """RBAC Frontend Blocking Enabled Sensor."""
+    config_key: str
+    default: Any = None
+    off_icon: str | None = None
+
+
+SENSOR_DESCRIPTIONS: tuple[RBACSensorEntityDescription, ...] = (
+    RBACSensorEntityDescription(
+        key="enabled",
+        name="RBAC Enabled",
+        icon=_ICON_SHIELD_ON,
+        off_icon=_ICON_SHIELD_OFF,
+        config_key="enabled",
+        default=True,
+    ),
+    RBACSensorEntityDescription(
+        key="show_notifications",
+        name="RBAC Show Notifications",
+        icon=_ICON_BELL_ON,
+        off_icon=_ICON_BELL_OFF,
+        config_key="show_notifications",
+        default=True,
+    ),
+    RBACSensorEntityDescription(
+        key="send_events",
+        name="RBAC Send Events",
+        icon=_ICON_SEND_ON,
+        off_icon=_ICON_SEND_OFF,
+        config_key="send_event",
+        default=True,
+    ),
+    RBACSensorEntityDescription(
+        key="last_rejection",
+        name="RBAC Last Rejection",
+        icon=_ICON_CLOCK_ALERT,
+        config_key="last_rejection",
+        default="Never",
+    ),
+    RBACSensorEntityDescription(
+        key="last_user_rejected",
+        name="RBAC Last User Rejected",
+        icon=_ICON_ACCOUNT_ALERT,
+        config_key="last_user_rejected",
+        default="None",
+    ),
+    RBACSensorEntityDescription(
+        key="frontend_blocking",
+        name="RBAC Frontend Blocking",
+        icon=_ICON_SHIELD_SEARCH,
+        off_icon=_ICON_SHIELD_OFF,
+        config_key="frontend_blocking_enabled",
+        default=True,
+    ),
+)
+
+
+class RBACSensor(RBACBaseSensor):
+    """RBAC sensor reflecting a single key of the access control configuration."""
     
-    def __init__(self, hass, device_id=None):
+    entity_description: RBACSensorEntityDescription
+    
+    def __init__(self, hass, device_id, description: RBACSensorEntityDescription):
         """Initialize the sensor."""
         super().__init__(hass, device_id)
-        self._attr_name = "RBAC Frontend Blocking"
-        self._attr_unique_id = f"{DOMAIN}_frontend_blocking"
-        self._attr_icon = "mdi:shield-search"
+        self.entity_description = description
+        self._attr_unique_id = f"{DOMAIN}_{description.key}"
+        # (icon, state) pairs indexed by bool(value); None for raw-value sensors
+        self._icon_states = (
+            ((description.off_icon, "off"), (description.icon, "on"))
+            if description.off_icon
+            else None
+        )
+        self._config_version = None
+        self._update_from_config()
+        
+    def _update_from_config(self):
+        """Copy the configuration value into the sensor attributes."""
+        # Skip the lookup while the configuration is unchanged since last poll;
+        # rejection updates bump runtime_version only
+        domain_data = self._domain_data
+        version = (domain_data.get("config_version", 0), domain_data.get("runtime_version", 0))
+        if version == self._config_version:
+            return
+        self._config_version = version
+        description = self.entity_description
+        access_config = domain_data.get("access_config", _EMPTY)
+        value = access_config.get(description.config_key, description.default)
+        if self._icon_states is None:
+            self._attr_native_value = value
+        else:
+            self._attr_icon, self._attr_native_value = self._icon_states[bool(value)]
         
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        access_config = self._hass.data.get(DOMAIN, {}).get("access_config", {})
-        frontend_blocking_enabled = access_config.get("frontend_blocking_enabled", True)
-        self._attr_icon = "mdi:shield-search" if frontend_blocking_enabled else "mdi:shield-off"
-        return "on" if frontend_blocking_enabled else "off"
+    async def async_update(self):
+        """Refresh the sensor on poll."""
+        self._update_from_config()
 
 
 async def async_setup_entry(
@@ -167,18 +216,12 @@ async def async_setup_entry(
     _LOGGER.info("Setting up RBAC sensor platform from config entry")
     
     # Get device ID from hass.data
-    device_id = hass.data.get(DOMAIN, {}).get("device_id")
+    device_id = hass.data.get(DOMAIN, _EMPTY).get("device_id")
     
     # Create all sensors
-    sensors = [
-        RBACConfigURLSensor(hass, device_id),
-        RBACEnabledSensor(hass, device_id),
-        RBACShowNotificationsSensor(hass, device_id),
-        RBACSendEventsSensor(hass, device_id),
-        RBACLastRejectionSensor(hass, device_id),
-        RBACLastUserRejectedSensor(hass, device_id),
-        RBACFrontendBlockingSensor(hass, device_id),
-    ]
+    sensors = [RBACConfigURLSensor(hass, device_id)]
+    sensors.extend(RBACSensor(hass, device_id, description) for description in SENSOR_DESCRIPTIONS)
     
-    async_add_entities(sensors, True)
-    _LOGGER.info(f"Added {len(sensors)} RBAC sensors")
+    # State is derived from in-memory config, so no update is needed before adding
+    async_add_entities(sensors)
+    _LOGGER.info("Added %d RBAC sensors", len(sensors))
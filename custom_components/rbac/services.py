@@ -1,402 +1,562 @@
 """Services for the RBAC integration."""
+from datetime import datetime
 import logging
 import os
 import mimetypes
-from typing import Any, Dict
+import re
+import sys
+from typing import Any, Dict, Final
 
 import voluptuous as vol
 import yaml
 
-from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.const import (
+    CONTENT_TYPE_JSON,
+    EVENT_SERVICE_REGISTERED,
+    EVENT_SERVICE_REMOVED,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.json import json_bytes
 from homeassistant.util.json import JsonObjectType
 from homeassistant.components.http import HomeAssistantView
 from aiohttp import web
 
+from .const import DEFAULT_ROLES
 from . import (
     DOMAIN, 
     get_user_config, 
     reload_access_config,
     _is_top_level_user,
     _is_builtin_ha_user,
+    _get_person_index,
     add_user_access,
-    remove_user_access,
-    update_user_role,
-    remove_user_restriction,
-    _save_access_control_config
+    _async_save_config_coalesced,
+    _save_access_control_config,
+    _set_access_config,
+    _set_runtime_fields,
+    _restore_saved_config,
+    _normalize_access_config,
+    _normalize_restrictions,
+    _dump_yaml,
+    _YAMLLoader,
+    _access_control_config_path,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-def _get_available_roles(hass: HomeAssistant) -> list:
-    """Get available roles from access control configuration."""
-    if DOMAIN not in hass.data:
-        return ["guest", "user", "admin", "super_admin"]  # Default roles
+# Shared read-only default for dict lookups; never mutate.
+_EMPTY: Final[dict] = {}
+
+# Set view of the ordered defaults, for role validation
+_DEFAULT_ROLE_SET: Final = frozenset(DEFAULT_ROLES)
+
+# Rejections are applied to the sensors this many seconds after the first
+# one of a burst
+_REJECTION_FLUSH_DELAY: Final = 0.1
+
+# Role names accepted by the config editor
+_ROLE_NAME_RE: Final = re.compile(r"\A[a-z0-9_]+\Z")
+
+def _get_available_roles(hass: HomeAssistant) -> tuple:
+    """Get available roles from access control configuration.
     
-    access_config = hass.data[DOMAIN].get("access_config", {})
-    roles = list(access_config.get("roles", {}).keys())
+    Rebuilt only when the access config version changes.
+    """
+    domain_data = hass.data.get(DOMAIN, _EMPTY)
+    version = domain_data.get("config_version", 0)
     
-    # If no roles defined, use default roles
-    if not roles:
-        roles = ["guest", "user", "admin", "super_admin"]
+    cached = domain_data.get("available_roles")
+    if cached and cached[0] == version:
+        return cached[1]
     
+    # If no roles defined, use default roles
+    roles = tuple(_get_role_mapping(hass) or DEFAULT_ROLES)
+    if DOMAIN in hass.data:
+        domain_data["available_roles"] = (version, roles)
     return roles
 
+def _get_role_mapping(hass: HomeAssistant) -> Dict[str, Any]:
+    """Return the configured roles mapping (empty if none is loaded)."""
+    return hass.data.get(DOMAIN, _EMPTY).get("access_config", _EMPTY).get("roles") or _EMPTY
+
 def _validate_role(hass: HomeAssistant, role: str) -> bool:
     """Validate if a role is available in the access control configuration."""
-    available_roles = _get_available_roles(hass)
-    return role in available_roles
+    # Test membership on the mapping itself instead of building a role list
+    return role in (_get_role_mapping(hass) or _DEFAULT_ROLE_SET)
+
+def _find_person_state(hass: HomeAssistant, user_id: str):
+    """Return the person entity state linked to a user, if any."""
+    return _get_person_index(hass).get(user_id)
+
+
+def _resolve_person_user_id(hass: HomeAssistant, person_entity_id: str) -> tuple:
+    """Resolve the user_id linked to a person entity.
+    
+    Returns a ``(user_id, error_message)`` tuple; exactly one of them is None.
+    """
+    person_state = hass.states.get(person_entity_id)
+    if not person_state:
+        return None, f"Person entity {person_entity_id} not found"
+    
+    user_id = person_state.attributes.get("user_id")
+    if not user_id:
+        return None, f"No user_id found for person {person_entity_id}"
+    
+    return user_id, None
+
+def _required_string(value: Any) -> str:
+    """Validate a non-empty string in a single call."""
+    value = cv.string(value)
+    if not value:
+        raise vol.Invalid("must not be empty")
+    return value
+
+def _required_strings_schema(*keys: str):
+    """Build a validator for services taking only required non-empty strings.
+    
+    Equivalent to ``vol.Schema({vol.Required(key): _required_string, ...})``
+    but checks the fixed shape directly instead of walking a schema tree.
+    """
+    expected = frozenset(keys)
+    
+    def validate(data: Any) -> Dict[str, str]:
+        if not isinstance(data, dict):
+            raise vol.Invalid("expected a dictionary")
+        if data.keys() != expected:
+            for key in keys:
+                if key not in data:
+                    raise vol.Invalid("required key not provided", path=[key])
+            extra = next(key for key in data if key not in expected)
+            raise vol.Invalid("extra keys not allowed", path=[extra])
+        validated = {}
+        for key in keys:
+            try:
+                validated[key] = _required_string(data[key])
+            except vol.Invalid as err:
+                raise vol.Invalid(err.msg, path=[key]) from err
+        return validated
+    
+    return validate
 
 # Service schemas
-GET_USER_CONFIG_SCHEMA = vol.Schema({
-    vol.Required("person"): cv.string,
-})
+# Services without arguments share one validator that only accepts {}
+_NO_ARGUMENTS_SCHEMA = _required_strings_schema()
+
+GET_USER_CONFIG_SCHEMA = _required_strings_schema("person")
 
-RELOAD_CONFIG_SCHEMA = vol.Schema({})
+RELOAD_CONFIG_SCHEMA = _NO_ARGUMENTS_SCHEMA
 
-LIST_USERS_SCHEMA = vol.Schema({})
+LIST_USERS_SCHEMA = _NO_ARGUMENTS_SCHEMA
 
 # User management schemas (restricted to top-level users)
-ADD_USER_SCHEMA = vol.Schema({
-    vol.Required("person"): cv.string,
-    vol.Required("role"): cv.string,
-})
+ADD_USER_SCHEMA = _required_strings_schema("person", "role")
 
-GET_AVAILABLE_ROLES_SCHEMA = vol.Schema({})
+GET_AVAILABLE_ROLES_SCHEMA = _NO_ARGUMENTS_SCHEMA
 
+# Fixed response messages
+_MSG_DENIED_RELOAD = "Access denied: Only admin users can reload configuration"
+_MSG_DENIED_ADD_USER = "Access denied: Only admin users can add users"
+_MSG_DENIED_GET_ROLES = "Access denied: Only top-level users can get available roles"
+_MSG_DENIED_GET_USER_CONFIG = "Access denied: Only top-level users can get other users' configuration"
+_MSG_RELOAD_OK = "Access control configuration reloaded successfully"
+_MSG_RELOAD_FAILED = "Failed to reload access control configuration"
+_MSG_NO_USERS = "No users configured (all users have full access)"
 
-async def async_setup_services(hass: HomeAssistant) -> None:
-    """Set up the RBAC services."""
+
+@callback
+def _require_top_level(hass: HomeAssistant, call: ServiceCall, action: str, *args: Any) -> bool:
+    """Check that the service caller has top-level access, logging a denial otherwise.
     
-    async def handle_get_user_config(call: ServiceCall) -> ServiceResponse:
-        """Handle the get_user_config service call."""
-        person_entity_id = call.data.get("person", "")
-        
-        # Extract user_id from person entity
-        try:
-            person_state = hass.states.get(person_entity_id)
-            if not person_state:
-                raise HomeAssistantError(f"Person entity {person_entity_id} not found")
-            
-            user_id = person_state.attributes.get("user_id")
-            if not user_id:
-                raise HomeAssistantError(f"No user_id found for person {person_entity_id}")
-        except Exception as e:
-            _LOGGER.error(f"Error extracting user_id from person {person_entity_id}: {e}")
-            raise HomeAssistantError(f"Error extracting user_id from person {person_entity_id}: {e}")
-        
-        user_config = get_user_config(hass, user_id)
-        
-        if user_config:
-            _LOGGER.info(f"User '{user_id}' configuration: {user_config}")
-            response_data: JsonObjectType = {
-                "success": True,
-                "user_id": user_id,
-                "config": user_config,
-                "message": f"User '{user_id}' configuration retrieved successfully"
-            }
-        else:
-            _LOGGER.info(f"User '{user_id}' not found in configuration (has full access)")
-            response_data: JsonObjectType = {
-                "success": True,
-                "user_id": user_id,
-                "config": None,
-                "message": f"User '{user_id}' not found in configuration (has full access)"
-            }
-        
-        # Fire event with the data
-        hass.bus.async_fire("rbac_service_response", {
-            "service": "get_user_config",
-            "data": response_data
-        })
-        
-        return response_data
-
-    async def handle_reload_config(call: ServiceCall) -> Dict[str, Any]:
-        """Handle the reload_config service call."""
-        # Check if caller has top-level access
-        caller_id = call.context.user_id if call.context else None
-        if not caller_id or not _is_top_level_user(hass, caller_id):
-            _LOGGER.warning(f"Access denied: User {caller_id} attempted to reload config")
-            return {
-                "success": False,
-                "message": "Access denied: Only admin users can reload configuration"
-            }
-        
-        success = await reload_access_config(hass)
-        
-        if success:
-            _LOGGER.info("Access control configuration reloaded successfully")
-            return {
-                "success": True,
-                "message": "Access control configuration reloaded successfully"
-            }
-        else:
-            _LOGGER.error("Failed to reload access control configuration")
-            return {
-                "success": False,
-                "message": "Failed to reload access control configuration"
-            }
+    ``action`` completes "User <id> attempted to ..." and may contain
+    %-placeholders filled from ``args``.
+    """
+    caller_id = call.context.user_id
+    if caller_id and _is_top_level_user(hass, caller_id):
+        return True
+    # Only format the action when the warning is actually emitted
+    if _LOGGER.isEnabledFor(logging.WARNING):
+        _LOGGER.warning("Access denied: User %s attempted to %s", caller_id, action % args)
+    return False
 
-    async def handle_list_users(call: ServiceCall) -> ServiceResponse:
-        """Handle the list_users service call."""
-        if DOMAIN not in hass.data:
-            users = {}
-        else:
-            access_config = hass.data[DOMAIN].get("access_config", {})
-            users = access_config.get("users", {})
-        
-        _LOGGER.info(f"Configured users: {list(users.keys())}")
-        
-        # Format user data for return
-        user_list = []
-        if users:
-            for user_id, user_config in users.items():
-                role = user_config.get("role", "unknown")
-                access = user_config.get("access", "allow")
-                user_list.append({
-                    "user_id": user_id,
-                    "role": role,
-                    "access": access
-                })
-        
+
+async def _async_handle_get_user_config(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the get_user_config service call."""
+    person_entity_id = call.data["person"]
+    
+    user_id, error = _resolve_person_user_id(hass, person_entity_id)
+    if error:
+        _LOGGER.error(error)
+        raise HomeAssistantError(error)
+    
+    # Users may read their own configuration; anyone else's needs top-level access
+    if call.context.user_id != user_id and not _require_top_level(
+        hass, call, "get configuration of user %s", user_id
+    ):
+        raise HomeAssistantError(_MSG_DENIED_GET_USER_CONFIG)
+    
+    user_config = get_user_config(hass, user_id)
+    
+    if user_config:
+        _LOGGER.info("User '%s' configuration: %s", user_id, user_config)
         response_data: JsonObjectType = {
             "success": True,
-            "users": user_list,
-            "count": len(user_list),
-            "message": f"Found {len(user_list)} configured users" if user_list else "No users configured (all users have full access)"
+            "user_id": user_id,
+            "config": user_config,
+            "message": f"User '{user_id}' configuration retrieved successfully"
         }
-        
-        # Fire event with the data
-        hass.bus.async_fire("rbac_service_response", {
-            "service": "list_users",
-            "data": response_data
-        })
-        
-        return response_data
+    else:
+        _LOGGER.info("User '%s' not found in configuration (has full access)", user_id)
+        response_data: JsonObjectType = {
+            "success": True,
+            "user_id": user_id,
+            "config": None,
+            "message": f"User '{user_id}' not found in configuration (has full access)"
+        }
+    
+    # Fire event with the data
+    hass.bus.async_fire("rbac_service_response", {
+        "service": "get_user_config",
+        "data": response_data
+    })
+    
+    return response_data
 
-    async def handle_add_user(call: ServiceCall) -> Dict[str, Any]:
-        """Handle the add_user service call."""
-        person_entity_id = call.data.get("person", "")
-        role = call.data.get("role", "")
-        
-        # Validate role
-        if not role:
-            raise HomeAssistantError("Role is required")
-        
-        if not _validate_role(hass, role):
-            available_roles = _get_available_roles(hass)
-            raise HomeAssistantError(f"Invalid role '{role}'. Available roles: {', '.join(available_roles)}")
-        
-        # Extract user_id from person entity
-        try:
-            person_state = hass.states.get(person_entity_id)
-            if not person_state:
-                _LOGGER.error(f"Person entity {person_entity_id} not found")
-                return {
-                    "success": False,
-                    "message": f"Person entity {person_entity_id} not found"
-                }
-            
-            user_id = person_state.attributes.get("user_id")
-            if not user_id:
-                _LOGGER.error(f"No user_id found for person {person_entity_id}")
-                return {
-                    "success": False,
-                    "message": f"No user_id found for person {person_entity_id}"
-                }
-        except Exception as e:
-            _LOGGER.error(f"Error extracting user_id from person {person_entity_id}: {e}")
-            return {
-                "success": False,
-                "message": f"Error extracting user_id from person {person_entity_id}: {e}"
-            }
-        
-        # Check if caller has top-level access
-        caller_id = call.context.user_id if call.context else None
-        if not caller_id or not _is_top_level_user(hass, caller_id):
-            _LOGGER.warning(f"Access denied: User {caller_id} attempted to add user {user_id}")
-            return {
-                "success": False,
-                "message": "Access denied: Only admin users can add users"
-            }
-        
-        # Check if user is a built-in HA user
-        if _is_builtin_ha_user(user_id):
-            _LOGGER.warning(f"Cannot add built-in Home Assistant user: {user_id}")
-            return {
-                "success": False,
-                "message": f"Cannot add built-in Home Assistant user: {user_id}"
-            }
-        
-        success = await add_user_access(hass, user_id, role)
-        
-        if success:
-            _LOGGER.info(f"Added user '{user_id}' with role '{role}'")
-            return {
-                "success": True,
-                "user_id": user_id,
-                "role": role,
-                "message": f"Successfully added user '{user_id}' with role '{role}'"
-            }
-        else:
-            _LOGGER.error(f"Failed to add user '{user_id}'")
-            return {
-                "success": False,
-                "message": f"Failed to add user '{user_id}'"
-            }
+async def _async_handle_reload_config(hass: HomeAssistant, call: ServiceCall) -> Dict[str, Any]:
+    """Handle the reload_config service call."""
+    # Check if caller has top-level access
+    if not _require_top_level(hass, call, "reload config"):
+        return {
+            "success": False,
+            "message": _MSG_DENIED_RELOAD
+        }
+    
+    success = await reload_access_config(hass)
+    
+    if success:
+        _LOGGER.info(_MSG_RELOAD_OK)
+        return {
+            "success": True,
+            "message": _MSG_RELOAD_OK
+        }
+    else:
+        _LOGGER.error(_MSG_RELOAD_FAILED)
+        return {
+            "success": False,
+            "message": _MSG_RELOAD_FAILED
+        }
 
-    async def handle_get_available_roles(call: ServiceCall) -> ServiceResponse:
-        """Handle the get_available_roles service call."""
-        # Check if caller has top-level access
-        caller_id = call.context.user_id if call.context else None
-        if not caller_id or not _is_top_level_user(hass, caller_id):
-            _LOGGER.warning(f"Access denied: User {caller_id} attempted to get available roles")
-            raise HomeAssistantError("Access denied: Only top-level users can get available roles")
-        
-        try:
-            # Get roles from access_config
-            roles = _get_available_roles(hass)
-            
-            _LOGGER.info(f"Available roles: {roles}")
-            
-            response_data: JsonObjectType = {
-                "success": True,
-                "roles": roles,
-                "count": len(roles),
-                "message": f"Found {len(roles)} available roles"
-            }
-            
-            # Fire event with the data
-            hass.bus.async_fire("rbac_service_response", {
-                "service": "get_available_roles",
-                "data": response_data
-            })
-            
-            return response_data
-            
-        except Exception as e:
-            _LOGGER.error(f"Error getting available roles: {e}")
-            raise HomeAssistantError(f"Error getting available roles: {e}")
+async def _async_handle_list_users(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the list_users service call."""
+    users = hass.data.get(DOMAIN, _EMPTY).get("access_config", _EMPTY).get("users", _EMPTY)
     
-    # Register services
-    hass.services.async_register(
-        DOMAIN, "get_user_config", handle_get_user_config, schema=GET_USER_CONFIG_SCHEMA, supports_response=SupportsResponse.ONLY
-    )
+    if _LOGGER.isEnabledFor(logging.INFO):
+        _LOGGER.info("Configured users: %s", list(users))
     
-    hass.services.async_register(
-        DOMAIN, "reload_config", handle_reload_config, schema=RELOAD_CONFIG_SCHEMA
-    )
+    # Format user data for return
+    user_list = [
+        {
+            "user_id": user_id,
+            "role": user_config.get("role", "unknown"),
+            "access": user_config.get("access", "allow")
+        }
+        for user_id, user_config in users.items()
+    ]
     
-    hass.services.async_register(
-        DOMAIN, "list_users", handle_list_users, schema=LIST_USERS_SCHEMA, supports_response=SupportsResponse.ONLY
-    )
+    response_data: JsonObjectType = {
+        "success": True,
+        "users": user_list,
+        "count": len(user_list),
+        "message": f"Found {len(user_list)} configured users" if user_list else _MSG_NO_USERS
+    }
+    
+    # Fire event with the data
+    hass.bus.async_fire("rbac_service_response", {
+        "service": "list_users",
+        "data": response_data
+    })
+    
+    return response_data
+
+async def _async_handle_add_user(hass: HomeAssistant, call: ServiceCall) -> Dict[str, Any]:
+    """Handle the add_user service call."""
+    person_entity_id = call.data["person"]
+    role = call.data["role"]
+    
+    # Check if caller has top-level access before doing any other work
+    if not _require_top_level(hass, call, "add user %s", person_entity_id):
+        return {
+            "success": False,
+            "message": _MSG_DENIED_ADD_USER
+        }
+    
+    # Validate role
+    if not _validate_role(hass, role):
+        available_roles = _get_available_roles(hass)
+        raise HomeAssistantError(f"Invalid role '{role}'. Available roles: {', '.join(available_roles)}")
+    
+    # Extract user_id from person entity
+    user_id, error = _resolve_person_user_id(hass, person_entity_id)
+    if error:
+        _LOGGER.error(error)
+        return {
+            "success": False,
+            "message": error
+        }
+    
+    # Check if user is a built-in HA user
+    if _is_builtin_ha_user(user_id, hass):
+        _LOGGER.warning("Cannot add built-in Home Assistant user: %s", user_id)
+        return {
+            "success": False,
+            "message": f"Cannot add built-in Home Assistant user: {user_id}"
+        }
+    
+    success = await add_user_access(hass, user_id, role)
+    
+    if success:
+        _LOGGER.info("Added user '%s' with role '%s'", user_id, role)
+        return {
+            "success": True,
+            "user_id": user_id,
+            "role": role,
+            "message": f"Successfully added user '{user_id}' with role '{role}'"
+        }
+    else:
+        _LOGGER.error("Failed to add user '%s'", user_id)
+        return {
+            "success": False,
+            "message": f"Failed to add user '{user_id}'"
+        }
+
+async def _async_handle_get_available_roles(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the get_available_roles service call."""
+    # Check if caller has top-level access
+    if not _require_top_level(hass, call, "get available roles"):
+        raise HomeAssistantError(_MSG_DENIED_GET_ROLES)
+    
+    # Get roles from access_config
+    roles = _get_available_roles(hass)
+    
+    _LOGGER.info("Available roles: %s", roles)
     
+    response_data: JsonObjectType = {
+        "success": True,
+        "roles": roles,
+        "count": len(roles),
+        "message": f"Found {len(roles)} available roles"
+    }
+    
+    # Fire event with the data
+    hass.bus.async_fire("rbac_service_response", {
+        "service": "get_available_roles",
+        "data": response_data
+    })
+    
+    return response_data
+
+
+# Service name -> (handler, schema, response support); handlers are dispatched
+# from the single registered callback
+_SERVICES = {
+    "get_user_config": (_async_handle_get_user_config, GET_USER_CONFIG_SCHEMA, SupportsResponse.ONLY),
+    "reload_config": (_async_handle_reload_config, RELOAD_CONFIG_SCHEMA, SupportsResponse.NONE),
+    "list_users": (_async_handle_list_users, LIST_USERS_SCHEMA, SupportsResponse.ONLY),
     # User management services (restricted to top-level users)
-    hass.services.async_register(
-        DOMAIN, "add_user", handle_add_user, schema=ADD_USER_SCHEMA
-    )
+    "add_user": (_async_handle_add_user, ADD_USER_SCHEMA, SupportsResponse.NONE),
+    "get_available_roles": (_async_handle_get_available_roles, GET_AVAILABLE_ROLES_SCHEMA, SupportsResponse.ONLY),
+}
+
+
+# Which change counters each cached listing depends on
+_LISTING_DEPENDENCIES = {
+    "entities": ("entities",),
+    "domains": ("entities", "services"),
+    "services": ("entities", "services"),
+}
+
+
+@callback
+def _async_setup_listing_cache(hass: HomeAssistant) -> None:
+    """Track the changes that invalidate the cached entity/domain/service listings.
     
-    hass.services.async_register(
-        DOMAIN, "get_available_roles", handle_get_available_roles, schema=GET_AVAILABLE_ROLES_SCHEMA, supports_response=SupportsResponse.ONLY
-    )
+    The listings only change when an entity appears or disappears or when a
+    service is registered or removed, not on ordinary state updates. Entity
+    and service changes are counted separately so that service registrations
+    leave the entity listing cached. Setup may run more than once; the
+    listeners are only registered once.
+    """
+    domain_data = hass.data[DOMAIN]
+    if "listing_cache_unsubs" in domain_data:
+        return
+    generations = domain_data["listing_generations"] = {"entities": 0, "services": 0}
+    domain_data["listing_cache"] = {}
     
-    _LOGGER.info("RBAC services registered successfully")
+    @callback
+    def _bump_entities(event) -> None:
+        generations["entities"] += 1
+    
+    @callback
+    def _bump_services(event) -> None:
+        generations["services"] += 1
+    
+    @callback
+    def _entity_added_or_removed(event_data) -> bool:
+        return event_data["old_state"] is None or event_data["new_state"] is None
+    
+    domain_data["listing_cache_unsubs"] = [
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _bump_entities, event_filter=_entity_added_or_removed),
+        hass.bus.async_listen(EVENT_SERVICE_REGISTERED, _bump_services),
+        hass.bus.async_listen(EVENT_SERVICE_REMOVED, _bump_services),
+    ]
 
 
-from homeassistant.components.http import HomeAssistantView
-from homeassistant.core import HomeAssistant
-import json
-import logging
+def _cached_listing_response(hass: HomeAssistant, key: str, build) -> web.Response:
+    """Return the JSON listing for key, rebuilding it only after a relevant change."""
+    domain_data = hass.data[DOMAIN]
+    generations = domain_data["listing_generations"]
+    version = tuple(generations[name] for name in _LISTING_DEPENDENCIES[key])
+    cache = domain_data["listing_cache"]
+    
+    cached = cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = cache[key] = (version, json_bytes(build()))
+    
+    return _json_bytes_response(cached[1])
 
-_LOGGER = logging.getLogger(__name__)
+
+def _json_bytes_response(body: bytes) -> web.Response:
+    """Wrap an already encoded JSON body in a response."""
+    # Same encoding and compression as HomeAssistantView.json(), minus the encode
+    response = web.Response(body=body, content_type=CONTENT_TYPE_JSON)
+    response.enable_compression()
+    return response
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the RBAC services."""
+    _async_setup_listing_cache(hass)
+    
+    async def handle_service(call: ServiceCall) -> ServiceResponse:
+        """Dispatch an RBAC service call to its handler."""
+        return await _SERVICES[call.service][0](hass, call)
+    
+    # Register services
+    for service, (_handler, schema, supports_response) in _SERVICES.items():
+        hass.services.async_register(
+            DOMAIN, service, handle_service, schema=schema, supports_response=supports_response
+        )
+    
+    _LOGGER.info("RBAC services registered successfully")
+
+
+def _get_rbac_admin_ids(hass: HomeAssistant) -> frozenset:
+    """Return the ids of users whose RBAC role has the admin flag.
+    
+    Rebuilt only when the access config version changes.
+    """
+    domain_data = hass.data.get(DOMAIN, _EMPTY)
+    version = domain_data.get("config_version", 0)
+    
+    cached = domain_data.get("rbac_admin_ids")
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    access_config = domain_data.get("access_config", _EMPTY)
+    roles = access_config.get("roles", _EMPTY)
+    admin_roles = {
+        role_name
+        for role_name, role_config in roles.items()
+        if role_config and role_config.get("admin", False)
+    }
+    admin_ids = frozenset(
+        user_id
+        for user_id, user_config in access_config.get("users", _EMPTY).items()
+        if user_config and user_config.get("role") in admin_roles
+    )
+    if DOMAIN in hass.data:
+        domain_data["rbac_admin_ids"] = (version, admin_ids)
+    return admin_ids
 
 
 async def _is_admin_user(hass: HomeAssistant, user_id: str, user_obj=None) -> bool:
     """Check if a user is an admin (either HA native admin or RBAC admin role)."""
     try:
-        # First check if user is a Home Assistant native admin
+        # RBAC admin roles come from the cached index, no auth lookup needed
+        if user_id in _get_rbac_admin_ids(hass):
+            _LOGGER.debug("User %s has an RBAC admin role", user_id)
+            return True
+        
+        # Otherwise check if user is a Home Assistant native admin
         try:
-            # If we have the user object directly, use it
-            if user_obj and hasattr(user_obj, 'is_admin'):
-                _LOGGER.debug(f"User object type: {type(user_obj)}, is_admin: {user_obj.is_admin}")
+            # Views pass the request user, which already carries the admin flag
+            if user_obj is not None:
                 if user_obj.is_admin:
-                    _LOGGER.warning(f"User {user_id} is Home Assistant native admin")
+                    _LOGGER.debug("User %s is Home Assistant native admin", user_id)
                     return True
             else:
-                # Try different methods to get the user
-                user = None
-                if hasattr(hass.auth, 'async_get_user'):
-                    user = await hass.auth.async_get_user(user_id)
-                elif hasattr(hass.auth, 'get_user'):
-                    user = hass.auth.get_user(user_id)
-                elif hasattr(hass.auth, '_store') and hasattr(hass.auth._store, 'async_get_user'):
-                    user = await hass.auth._store.async_get_user(user_id)
-                
-                if user and hasattr(user, 'is_admin') and user.is_admin:
-                    _LOGGER.warning(f"User {user_id} is Home Assistant native admin")
+                user = await hass.auth.async_get_user(user_id)
+                if user and user.is_admin:
+                    _LOGGER.debug("User %s is Home Assistant native admin", user_id)
                     return True
                 elif user:
-                    _LOGGER.debug(f"User {user_id} found but not admin: {type(user)}")
+                    _LOGGER.debug("User %s found but not admin: %s", user_id, type(user))
         except Exception as e:
-            _LOGGER.warning(f"Could not check HA native admin status for user {user_id}: {e}")
-        
-        # Then check RBAC admin role
-        access_config = hass.data.get(DOMAIN, {}).get("access_config", {})
-        users = access_config.get("users", {})
-        
-        # Check if current user has admin role
-        user_config = users.get(user_id)
-        if not user_config:
-            _LOGGER.warning(f"User {user_id} not found in RBAC configuration")
-            return False
-        
-        user_role = user_config.get("role", "unknown")
-        if user_role == "unknown":
-            _LOGGER.warning(f"User {user_id} has no role assigned")
-            return False
+            _LOGGER.warning("Could not check HA native admin status for user %s: %s", user_id, e)
         
-        # Get role configuration and check admin flag
-        roles = access_config.get("roles", {})
-        role_config = roles.get(user_role, {})
-        is_rbac_admin = role_config.get("admin", False)
-        
-        if is_rbac_admin:
-            _LOGGER.warning(f"User {user_id} has RBAC admin role: {user_role}")
-        
-        return is_rbac_admin
+        _LOGGER.debug("User %s is neither a native nor an RBAC admin", user_id)
+        return False
         
     except Exception as e:
-        _LOGGER.error(f"Error checking admin status: {e}")
+        _LOGGER.error("Error checking admin status: %s", e)
         return False
 
 
-def _update_rejection_sensors(hass: HomeAssistant, user_id: str, service: str):
-    """Update the last rejection sensors when access is denied."""
+def _update_rejection_sensors(hass: HomeAssistant, user_id: str, service: str, user=None):
+    """Record a denied call for the last rejection sensors.
+    
+    ``user`` is the caller's auth user, if the caller already looked it up.
+    The sensors are updated shortly afterwards from the most recent
+    rejection, so a burst of denials costs a single update.
+    """
+    domain_data = hass.data[DOMAIN]
+    domain_data["pending_rejection"] = (datetime.now(), user_id, user)
+    if not domain_data.get("rejection_flush_handle"):
+        domain_data["rejection_flush_handle"] = hass.loop.call_later(
+            _REJECTION_FLUSH_DELAY, _flush_rejection_sensors, hass
+        )
+
+
+@callback
+def _flush_rejection_sensors(hass: HomeAssistant) -> None:
+    """Update the last rejection sensors from the most recent rejection."""
+    domain_data = hass.data[DOMAIN]
+    domain_data.pop("rejection_flush_handle", None)
+    pending = domain_data.pop("pending_rejection", None)
+    if pending is None:
+        return
+    rejected_at, user_id, user = pending
+    
     try:
-        from datetime import datetime
-        
-        # Get current time
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Time of the denial, not of the flush
+        now = rejected_at.isoformat(sep=" ", timespec="seconds")
         
         # Get user name from person entity
         user_name = "Unknown"
         try:
             # First try to get the person entity for this user
-            for state in hass.states.async_all():
-                if state.domain == "person" and state.attributes.get("user_id") == user_id:
-                    # Use the friendly name from the person entity
-                    user_name = state.attributes.get("friendly_name") or state.name
-                    break
+            person_state = _find_person_state(hass, user_id)
+            if person_state:
+                # Use the friendly name from the person entity
+                user_name = person_state.attributes.get("friendly_name") or person_state.name
             
             # Fallback to user name if no person entity found
-            if user_name == "Unknown":
-                user = hass.auth.async_get_user(user_id)
-                if user:
-                    user_name = user.name or f"User {user_id[:8]}"
-        except:
-            pass
+            if user_name == "Unknown" and user:
+                user_name = user.name or f"User {user_id[:8]}"
+        except Exception as e:
+            _LOGGER.debug("Could not resolve the name of rejected user %s: %s", user_id, e)
         
         # Update sensors
         hass.states.async_set(
@@ -418,28 +578,10 @@ def _update_rejection_sensors(hass: HomeAssistant, user_id: str, service: str):
         )
         
         # Update access config in memory
-        access_config = hass.data.get(DOMAIN, {}).get("access_config", {})
-        access_config["last_rejection"] = now
-        access_config["last_user_rejected"] = user_name
-        hass.data[DOMAIN]["access_config"] = access_config
-        
-        # Save to YAML file for persistence
-        try:
-            from . import _save_access_control_config
-            # Use asyncio to run the async function
-            import asyncio
-            loop = hass.loop
-            if loop.is_running():
-                # Schedule the save operation
-                asyncio.create_task(_save_access_control_config(hass, access_config))
-            else:
-                # Run directly if no event loop is running
-                loop.run_until_complete(_save_access_control_config(hass, access_config))
-        except Exception as save_error:
-            _LOGGER.error(f"Error saving rejection data to YAML: {save_error}")
+        _set_runtime_fields(hass, {"last_rejection": now, "last_user_rejected": user_name})
         
     except Exception as e:
-        _LOGGER.error(f"Error updating rejection sensors: {e}")
+        _LOGGER.error("Error updating rejection sensors: %s", e)
 
 
 class RBACConfigView(HomeAssistantView):
@@ -463,14 +605,23 @@ class RBACConfigView(HomeAssistantView):
                     "redirect_url": "/"
                 }, status_code=403)
             
-            # Load configuration directly from the YAML file
-            from . import _load_access_control_config
-            access_config = await _load_access_control_config(hass)
-            
-            # Return the configuration as-is for role-based management
-            return self.json(access_config)
+            # Serve the in-memory configuration; ?refresh=1 (or a cold start)
+            # reads the YAML file instead
+            domain_data = hass.data.get(DOMAIN, _EMPTY)
+            access_config = domain_data.get("access_config")
+            if access_config is None or request.query.get("refresh") == "1":
+                from . import _load_access_control_config
+                return self.json(await _load_access_control_config(hass))
+            
+            # Return the configuration as-is for role-based management, encoded
+            # once per config version and rejection update
+            version = (domain_data.get("config_version", 0), domain_data.get("runtime_version", 0))
+            cached = domain_data.get("config_response")
+            if cached is None or cached[0] != version:
+                cached = domain_data["config_response"] = (version, json_bytes(access_config))
+            return _json_bytes_response(cached[1])
         except Exception as e:
-            _LOGGER.error(f"Error getting RBAC config: {e}")
+            _LOGGER.error("Error getting RBAC config: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
     async def post(self, request):
@@ -479,7 +630,7 @@ class RBACConfigView(HomeAssistantView):
         user = request["hass_user"]
         
         # Check admin permissions
-        if not await _is_admin_user(hass, user.id):
+        if not await _is_admin_user(hass, user.id, user):
             return self.json({
                 "error": "Admin access required",
                 "message": "Only administrators can modify RBAC configuration",
@@ -493,29 +644,47 @@ class RBACConfigView(HomeAssistantView):
             if not action:
                 return self.json({"error": "Missing action"}, status_code=400)
             
-            # Load current configuration from YAML file
-            from . import _load_access_control_config, _save_access_control_config
-            access_config = await _load_access_control_config(hass)
+            # Only load from disk if nothing is in memory yet; re-check after the
+            # await in case a concurrent request got there first
+            domain_data = hass.data.setdefault(DOMAIN, {})
+            if domain_data.get("access_config") is None:
+                from . import _load_access_control_config
+                loaded_config = await _load_access_control_config(hass)
+                if domain_data.get("access_config") is None:
+                    _set_access_config(hass, loaded_config)
+            
+            # Everything from here to _set_access_config() below runs without
+            # yielding to the event loop, so concurrent edits cannot interleave
+            # and no per-section locks are needed. Edit a shallow copy of the
+            # in-memory configuration (which includes any debounced change) and
+            # replace, rather than mutate, every nested section that changes, so
+            # large unchanged sections are never copied. Only the sections taken
+            # from the request are normalized; live sections already are.
+            access_config = dict(domain_data["access_config"])
             
             if action == "update_role":
                 role_name = data.get("roleName")
                 role_config = data.get("roleConfig")
                 
-                _LOGGER.info(f"Updating role: {role_name} with config: {role_config}")
+                _LOGGER.info("Updating role: %s with config: %s", role_name, role_config)
                 
                 if not role_name or not role_config:
                     return self.json({"error": "Missing roleName or roleConfig"}, status_code=400)
                 
                 # Validate role name format
-                import re
-                if not re.match(r'^[a-z0-9_]+$', role_name):
+                if not _ROLE_NAME_RE.match(role_name):
                     return self.json({"error": "Role name must contain only lowercase letters, numbers, and underscores"}, status_code=400)
                 
+                if isinstance(role_config, dict):
+                    try:
+                        _normalize_restrictions(role_config.get("permissions"))
+                    except ValueError as e:
+                        return self.json({"error": f"Invalid role permissions: {e}"}, status_code=400)
+                
                 # Update or create role
-                if "roles" not in access_config:
-                    access_config["roles"] = {}
-                access_config["roles"][role_name] = role_config
-                _LOGGER.info(f"Role {role_name} saved successfully")
+                role_name = sys.intern(role_name)
+                access_config["roles"] = {**(access_config.get("roles") or {}), role_name: role_config}
+                _LOGGER.info("Role %s saved successfully", role_name)
                 
             elif action == "delete_role":
                 role_name = data.get("roleName")
@@ -525,13 +694,22 @@ class RBACConfigView(HomeAssistantView):
                 
                 # Delete role
                 if "roles" in access_config and role_name in access_config["roles"]:
-                    del access_config["roles"][role_name]
+                    access_config["roles"] = {
+                        name: config
+                        for name, config in access_config["roles"].items()
+                        if name != role_name
+                    }
                     
                 # Remove role from users
                 if "users" in access_config:
-                    for user_id, user_config in access_config["users"].items():
-                        if user_config.get("role") == role_name:
-                            user_config["role"] = "user"  # Default role
+                    access_config["users"] = {
+                        user_id: (
+                            {**user_config, "role": "user"}  # Default role
+                            if user_config.get("role") == role_name
+                            else user_config
+                        )
+                        for user_id, user_config in access_config["users"].items()
+                    }
                             
             elif action == "assign_user_role":
                 user_id = data.get("userId")
@@ -541,11 +719,9 @@ class RBACConfigView(HomeAssistantView):
                     return self.json({"error": "Missing userId or roleName"}, status_code=400)
                 
                 # Assign role to user
-                if "users" not in access_config:
-                    access_config["users"] = {}
-                if user_id not in access_config["users"]:
-                    access_config["users"][user_id] = {}
-                access_config["users"][user_id]["role"] = role_name
+                users = dict(access_config.get("users") or {})
+                users[user_id] = {**(users.get(user_id) or {}), "role": sys.intern(role_name)}
+                access_config["users"] = users
                 
             elif action == "update_default_restrictions":
                 restrictions = data.get("restrictions")
@@ -553,6 +729,11 @@ class RBACConfigView(HomeAssistantView):
                 if not restrictions:
                     return self.json({"error": "Missing restrictions"}, status_code=400)
                 
+                try:
+                    _normalize_restrictions(restrictions)
+                except ValueError as e:
+                    return self.json({"error": f"Invalid restrictions: {e}"}, status_code=400)
+                
                 # Update default restrictions
                 access_config["default_restrictions"] = restrictions
                 
@@ -571,25 +752,22 @@ class RBACConfigView(HomeAssistantView):
                 if "allow_chained_actions" in data:
                     access_config["allow_chained_actions"] = data["allow_chained_actions"]
                 
-            # Preserve runtime fields that shouldn't be saved to YAML
-            config_to_save = access_config.copy()
-            runtime_fields = ["last_rejection", "last_user_rejected"]
-            for field in runtime_fields:
-                if field in config_to_save:
-                    del config_to_save[field]
-            
-            # Save configuration back to YAML file
-            success = await _save_access_control_config(hass, config_to_save)
+            # Publish the edited config before writing so concurrent edits build
+            # on each other; overlapping requests then share a single write
+            _set_access_config(hass, access_config)
+            success = await _async_save_config_coalesced(hass)
             
             if success:
-                # Update the in-memory config as well (keep runtime fields)
-                hass.data[DOMAIN]["access_config"] = access_config
                 return self.json({"success": True})
             else:
+                # Fall back to what is on disk, unless a later edit replaced this
+                # one; that edit's request rolls back once its own write fails
+                if domain_data["access_config"] is access_config:
+                    _restore_saved_config(hass)
                 return self.json({"error": "Failed to save configuration"}, status_code=500)
                 
         except Exception as e:
-            _LOGGER.error(f"Error updating RBAC config: {e}")
+            _LOGGER.error("Error updating RBAC config: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
@@ -606,7 +784,7 @@ class RBACUsersView(HomeAssistantView):
         user = request["hass_user"]
         
         # Check admin permissions
-        if not await _is_admin_user(hass, user.id):
+        if not await _is_admin_user(hass, user.id, user):
             return self.json({
                 "error": "Admin access required",
                 "message": "Only administrators can access user information",
@@ -614,51 +792,45 @@ class RBACUsersView(HomeAssistantView):
             }, status_code=403)
         
         try:
-            users = []
-            for user_id in hass.auth._store._users:
-                try:
-                    user = await hass.auth.async_get_user(user_id)
-                    if user:
-                        # Skip built-in Home Assistant users (those without person entities)
-                        if _is_builtin_ha_user(user_id, hass):
-                            _LOGGER.debug(f"Skipping built-in HA user: {user_id} ({user.name})")
-                            continue
-                        
-                        # Try to find the person entity for this user
-                        entity_picture = None
-                        person_entity_id = None
-                        
-                        # Look for person entities that match this user
-                        all_states = hass.states.async_all()
-                        for state in all_states:
-                            if state.entity_id.startswith('person.'):
-                                # Check if this person entity belongs to this user
-                                if hasattr(state, 'attributes') and 'user_id' in state.attributes:
-                                    if state.attributes['user_id'] == user_id:
-                                        person_entity_id = state.entity_id
-                                        # Get the entity_picture from the person entity
-                                        if 'entity_picture' in state.attributes:
-                                            entity_picture = state.attributes['entity_picture']
-                                        break
-                        
-                        user_data = {
-                            "id": user.id,
-                            "name": user.name or f"User {user.id[:8]}",
-                            "entity_picture": entity_picture,
-                            "person_entity_id": person_entity_id
-                        }
-                        
-                        users.append(user_data)
-                        
-                except Exception as e:
-                    _LOGGER.debug(f"Could not get user {user_id}: {e}")
+            # Built-in Home Assistant users (those without person entities) are skipped
+            person_index = _get_person_index(hass)
+            users = [
+                {
+                    "id": user.id,
+                    "name": user.name or f"User {user.id[:8]}",
+                    "entity_picture": person_state.attributes.get("entity_picture"),
+                    "person_entity_id": person_state.entity_id
+                }
+                for user in await hass.auth.async_get_users()
+                if (person_state := person_index.get(user.id)) is not None
+            ]
             
             return self.json(users)
         except Exception as e:
-            _LOGGER.error(f"Error getting users: {e}")
+            _LOGGER.error("Error getting users: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
+def _available_domains(hass: HomeAssistant) -> set:
+    """Return the domains of all entities and services."""
+    # Get domains from entity ids (no State list, no split() lists)
+    domains = {
+        entity_id.partition('.')[0]
+        for entity_id in hass.states.async_entity_ids()
+    }
+    
+    # Get domains from services (including domains that have no entities);
+    # only the keys are needed, so skip the per-domain copies
+    domains.update(hass.services.async_services_internal())
+    
+    return domains
+
+
+def _list_domains(hass: HomeAssistant) -> list:
+    """Return the sorted domains of all entities and services."""
+    return sorted(_available_domains(hass))
+
+
 class RBACDomainsView(HomeAssistantView):
     """Handle RBAC domains API requests."""
 
@@ -672,7 +844,7 @@ class RBACDomainsView(HomeAssistantView):
         user = request["hass_user"]
         
         # Check admin permissions
-        if not await _is_admin_user(hass, user.id):
+        if not await _is_admin_user(hass, user.id, user):
             return self.json({
                 "error": "Admin access required",
                 "message": "Only administrators can access domain information",
@@ -680,24 +852,30 @@ class RBACDomainsView(HomeAssistantView):
             }, status_code=403)
         
         try:
-            domains = set()
-            
-            # Get domains from entities
-            all_states = hass.states.async_all()
-            for state in all_states:
-                domain = state.entity_id.split('.')[0]
-                domains.add(domain)
-            
-            # Get domains from services (including domains that have no entities)
-            for domain in hass.services.async_services().keys():
-                domains.add(domain)
-            
-            return self.json(sorted(list(domains)))
+            return _cached_listing_response(hass, "domains", lambda: _list_domains(hass))
         except Exception as e:
-            _LOGGER.error(f"Error getting domains: {e}")
+            _LOGGER.error("Error getting domains: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
+def _list_entity_ids(hass: HomeAssistant) -> list:
+    """Return all entity ids, sorted.
+    
+    The sorted list is kept until an entity is added or removed and shared
+    between the full and the limited listings; never mutate it.
+    """
+    domain_data = hass.data[DOMAIN]
+    generation = domain_data["listing_generations"]["entities"]
+    
+    cached = domain_data.get("sorted_entity_ids")
+    if cached is None or cached[0] != generation:
+        # async_entity_ids() returns a fresh list, so sort it in place
+        entity_ids = hass.states.async_entity_ids()
+        entity_ids.sort()
+        cached = domain_data["sorted_entity_ids"] = (generation, entity_ids)
+    return cached[1]
+
+
 class RBACEntitiesView(HomeAssistantView):
     """Handle RBAC entities API requests."""
 
@@ -711,23 +889,62 @@ class RBACEntitiesView(HomeAssistantView):
         user = request["hass_user"]
         
         # Check admin permissions
-        if not await _is_admin_user(hass, user.id):
+        if not await _is_admin_user(hass, user.id, user):
             return self.json({
                 "error": "Admin access required",
                 "message": "Only administrators can access entity information",
                 "redirect_url": "/"
             }, status_code=403)
         
+        limit = request.query.get("limit")
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = -1
+            if limit < 0:
+                return self.json({"error": "limit must be a non-negative integer"}, status_code=400)
+        
         try:
-            all_states = hass.states.async_all()
-            entities = [state.entity_id for state in all_states]
+            # A limited listing is a prefix of the cached sorted listing
+            if limit is not None:
+                return self.json(_list_entity_ids(hass)[:limit])
             
-            return self.json(sorted(entities))
+            return _cached_listing_response(hass, "entities", lambda: _list_entity_ids(hass))
         except Exception as e:
-            _LOGGER.error(f"Error getting entities: {e}")
+            _LOGGER.error("Error getting entities: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
+def _list_services(hass: HomeAssistant) -> dict:
+    """Return the available services organized by domain and entity."""
+    # Get services by domain from a single registry snapshot; kept until a
+    # service is registered or removed, so entity changes only redo the
+    # entity mapping below
+    domain_data = hass.data[DOMAIN]
+    generation = domain_data["listing_generations"]["services"]
+    cached = domain_data.get("services_by_domain")
+    if cached is None or cached[0] != generation:
+        cached = domain_data["services_by_domain"] = (generation, {
+            domain: sorted(service_dict)
+            for domain, service_dict in hass.services.async_services_internal().items()
+        })
+    services_by_domain = cached[1]
+    
+    # Get services by entity (for entities that have specific services);
+    # entities of the same domain share that domain's read-only list
+    services_by_entity = {
+        entity_id: entity_services
+        for entity_id in hass.states.async_entity_ids()
+        if (entity_services := services_by_domain.get(entity_id.partition('.')[0]))
+    }
+    
+    return {
+        "domains": services_by_domain,
+        "entities": services_by_entity
+    }
+
+
 class RBACServicesView(HomeAssistantView):
     """Handle RBAC services API requests."""
 
@@ -741,7 +958,7 @@ class RBACServicesView(HomeAssistantView):
         user = request["hass_user"]
         
         # Check admin permissions
-        if not await _is_admin_user(hass, user.id):
+        if not await _is_admin_user(hass, user.id, user):
             return self.json({
                 "error": "Admin access required",
                 "message": "Only administrators can access service information",
@@ -749,33 +966,9 @@ class RBACServicesView(HomeAssistantView):
             }, status_code=403)
         
         try:
-            services_by_domain = {}
-            services_by_entity = {}
-            
-            # Get services by domain
-            for domain, service_dict in hass.services.async_services().items():
-                services_by_domain[domain] = list(service_dict.keys())
-            
-            # Get services by entity (for entities that have specific services)
-            all_states = hass.states.async_all()
-            for state in all_states:
-                entity_id = state.entity_id
-                domain = entity_id.split('.')[0]
-                
-                # Get services for this specific entity
-                entity_services = []
-                if domain in hass.services.async_services():
-                    entity_services = list(hass.services.async_services()[domain].keys())
-                
-                if entity_services:
-                    services_by_entity[entity_id] = entity_services
-            
-            return self.json({
-                "domains": services_by_domain,
-                "entities": services_by_entity
-            })
+            return _cached_listing_response(hass, "services", lambda: _list_services(hass))
         except Exception as e:
-            _LOGGER.error(f"Error getting services: {e}")
+            _LOGGER.error("Error getting services: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
@@ -793,22 +986,17 @@ class RBACCurrentUserView(HomeAssistantView):
             user = request["hass_user"]
             
             # Get user's role from access control config
-            access_config = hass.data.get(DOMAIN, {}).get("access_config", {})
-            users = access_config.get("users", {})
+            users = hass.data.get(DOMAIN, _EMPTY).get("access_config", _EMPTY).get("users", _EMPTY)
             user_role = users.get(user.id, "unknown")
             
             # Get entity_picture from person entity (same logic as users API)
             entity_picture = None
             person_entity_id = None
             
-            # Look for person entities associated with this user
-            for state in hass.states.async_all():
-                if state.domain == "person" and state.attributes.get("user_id") == user.id:
-                    person_entity_id = state.entity_id
-                    # Get the entity_picture from the person entity
-                    if 'entity_picture' in state.attributes:
-                        entity_picture = state.attributes['entity_picture']
-                    break
+            person_state = _find_person_state(hass, user.id)
+            if person_state:
+                person_entity_id = person_state.entity_id
+                entity_picture = person_state.attributes.get("entity_picture")
             
             return self.json({
                 "id": user.id,
@@ -820,7 +1008,7 @@ class RBACCurrentUserView(HomeAssistantView):
                 "person_entity_id": person_entity_id
             })
         except Exception as e:
-            _LOGGER.error(f"Error getting current user: {e}")
+            _LOGGER.error("Error getting current user: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
@@ -837,12 +1025,13 @@ class RBACSensorsView(HomeAssistantView):
             hass = request.app["hass"]
             
             # Get sensor states
+            states_get = hass.states.get
             sensors = {
-                "last_rejection": hass.states.get(f"sensor.{DOMAIN}_last_rejection"),
-                "last_user_rejected": hass.states.get(f"sensor.{DOMAIN}_last_user_rejected"),
-                "enabled": hass.states.get(f"sensor.{DOMAIN}_enabled"),
-                "show_notifications": hass.states.get(f"sensor.{DOMAIN}_show_notifications"),
-                "send_events": hass.states.get(f"sensor.{DOMAIN}_send_events"),
+                "last_rejection": states_get(f"sensor.{DOMAIN}_last_rejection"),
+                "last_user_rejected": states_get(f"sensor.{DOMAIN}_last_user_rejected"),
+                "enabled": states_get(f"sensor.{DOMAIN}_enabled"),
+                "show_notifications": states_get(f"sensor.{DOMAIN}_show_notifications"),
+                "send_events": states_get(f"sensor.{DOMAIN}_send_events"),
             }
             
             # Convert to simple dict
@@ -858,7 +1047,7 @@ class RBACSensorsView(HomeAssistantView):
             
             return self.json(result)
         except Exception as e:
-            _LOGGER.error(f"Error getting RBAC sensors: {e}")
+            _LOGGER.error("Error getting RBAC sensors: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
@@ -876,7 +1065,7 @@ class RBACDenyLogView(HomeAssistantView):
             user = request["hass_user"]
             
             # Check admin permissions
-            if not await _is_admin_user(hass, user.id):
+            if not await _is_admin_user(hass, user.id, user):
                 return self.json({
                     "error": "Admin access required",
                     "message": "Only administrators can access deny logs",
@@ -893,7 +1082,7 @@ class RBACDenyLogView(HomeAssistantView):
             })
             
         except Exception as e:
-            _LOGGER.error(f"Error getting deny log: {e}")
+            _LOGGER.error("Error getting deny log: %s", e)
             return self.json({
                 "success": False,
                 "error": str(e)
@@ -906,7 +1095,7 @@ class RBACDenyLogView(HomeAssistantView):
             user = request["hass_user"]
             
             # Check admin permissions
-            if not await _is_admin_user(hass, user.id):
+            if not await _is_admin_user(hass, user.id, user):
                 return self.json({
                     "error": "Admin access required",
                     "message": "Only administrators can clear deny logs",
@@ -918,7 +1107,7 @@ class RBACDenyLogView(HomeAssistantView):
             success = _clear_deny_log(hass)
             
             if success:
-                _LOGGER.info(f"Deny log cleared by user {user.name} ({user.id})")
+                _LOGGER.info("Deny log cleared by user %s (%s)", user.name, user.id)
                 return self.json({
                     "success": True,
                     "message": "Deny log cleared successfully"
@@ -930,7 +1119,7 @@ class RBACDenyLogView(HomeAssistantView):
                 }, status_code=500)
             
         except Exception as e:
-            _LOGGER.error(f"Error clearing deny log: {e}")
+            _LOGGER.error("Error clearing deny log: %s", e)
             return self.json({
                 "success": False,
                 "error": str(e)
@@ -967,12 +1156,11 @@ class RBACTemplateEvaluateView(HomeAssistantView):
             user_person_entity = None
             try:
                 # Look for person entities associated with this user
-                for state in hass.states.async_all():
-                    if state.domain == "person" and state.attributes.get("user_id") == user.id:
-                        user_person_entity = state.entity_id
-                        break
+                person_state = _find_person_state(hass, user.id)
+                if person_state:
+                    user_person_entity = person_state.entity_id
             except Exception as e:
-                _LOGGER.debug(f"Could not find person entity for user {user.id}: {e}")
+                _LOGGER.debug("Could not find person entity for user %s: %s", user.id, e)
             
             # Create template context with user variable
             template_context = {}
@@ -992,13 +1180,312 @@ class RBACTemplateEvaluateView(HomeAssistantView):
             })
             
         except Exception as e:
-            _LOGGER.error(f"Error evaluating template: {e}")
+            _LOGGER.error("Error evaluating template: %s", e)
             return self.json({
                 "success": False,
                 "error": str(e)
             }, status_code=200)  # Return 200 so frontend can handle error gracefully
 
 
+def _build_frontend_blocking(hass: HomeAssistant, access_config: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Resolve what the frontend should hide for a user."""
+    rbac_enabled = access_config.get("enabled", True)
+    frontend_blocking_enabled = access_config.get("frontend_blocking_enabled", True)
+    
+    if not rbac_enabled or not frontend_blocking_enabled:
+        return {
+            "enabled": False,
+            "domains": [],
+            "entities": [],
+            "services": []
+        }
+    
+    # Get user configuration
+    users = access_config.get("users", {})
+    user_config = users.get(user_id)
+    
+    if not user_config:
+        # User not in config, return empty blocking (full access)
+        return {
+            "enabled": True,
+            "domains": [],
+            "entities": [],
+            "services": []
+        }
+    
+    # Get user role
+    user_role = user_config.get("role", "user")
+    roles = access_config.get("roles", {})
+    role_config = roles.get(user_role, {})
+    
+    # Check if user has admin role (bypasses restrictions)
+    if role_config.get("admin", False):
+        return {
+            "enabled": True,
+            "domains": [],
+            "entities": [],
+            "services": []
+        }
+    
+    # Check if role has deny_all enabled
+    deny_all = role_config.get("deny_all", False)
+    if deny_all:
+        # In deny_all mode, we need to get all available domains/entities
+        # and only allow those explicitly marked with allow: true
+        
+        # Get all available domains and entities
+        all_available_domains = _available_domains(hass)
+        all_available_entities = hass.states.async_entity_ids()
+        
+        # Get role permissions to find allowed items
+        role_permissions = role_config.get("permissions", {})
+        role_domains = role_permissions.get("domains", {})
+        role_entities = role_permissions.get("entities", {})
+        
+        # Get user-specific restrictions
+        user_restrictions = user_config.get("restrictions", {})
+        user_domains = user_restrictions.get("domains", {})
+        user_entities = user_restrictions.get("entities", {})
+        
+        # Build blocked and allowed lists - block everything except explicitly allowed
+        blocked_domains = []
+        blocked_entities = []
+        blocked_services = []
+        allowed_domains = []
+        allowed_entities = []
+        
+        # Process domains - block all except those with allow: true
+        for domain in all_available_domains:
+            domain_allowed = False
+            
+            # Check user-specific restrictions first
+            if domain in user_domains:
+                user_domain_config = user_domains[domain]
+                if isinstance(user_domain_config, dict):
+                    domain_allowed = user_domain_config.get("allow", False)
+            
+            # Check role-specific permissions
+            if not domain_allowed and domain in role_domains:
+                role_domain_config = role_domains[domain]
+                if isinstance(role_domain_config, dict):
+                    domain_allowed = role_domain_config.get("allow", False)
+            
+            if domain_allowed:
+                allowed_domains.append(domain)
+            else:
+                blocked_domains.append(domain)
+        
+        # Process entities - block all except those with allow: true
+        for entity in all_available_entities:
+            entity_allowed = False
+            
+            # Check user-specific restrictions first
+            if entity in user_entities:
+                user_entity_config = user_entities[entity]
+                if isinstance(user_entity_config, dict):
+                    entity_allowed = user_entity_config.get("allow", False)
+            
+            # Check role-specific permissions
+            if not entity_allowed and entity in role_entities:
+                role_entity_config = role_entities[entity]
+                if isinstance(role_entity_config, dict):
+                    entity_allowed = role_entity_config.get("allow", False)
+            
+            if entity_allowed:
+                allowed_entities.append(entity)
+            else:
+                blocked_entities.append(entity)
+        
+        return {
+            "enabled": True,
+            "domains": blocked_domains,
+            "entities": blocked_entities,
+            "services": blocked_services,
+            "allowed_domains": allowed_domains,
+            "allowed_entities": allowed_entities
+        }
+    
+    # Get default restrictions
+    default_restrictions = access_config.get("default_restrictions", {})
+    default_domains = default_restrictions.get("domains", {})
+    default_entities = default_restrictions.get("entities", {})
+    
+    # Get role-specific permissions
+    role_permissions = role_config.get("permissions", {})
+    role_domains = role_permissions.get("domains", {})
+    role_entities = role_permissions.get("entities", {})
+    
+    # Get user-specific restrictions
+    user_restrictions = user_config.get("restrictions", {})
+    user_domains = user_restrictions.get("domains", {})
+    user_entities = user_restrictions.get("entities", {})
+    
+    # Check if role allows by default (opposite of deny_all)
+    role_allows_by_default = not role_config.get("deny_all", False)
+    
+    # Get all available domains and entities from Home Assistant
+    all_available_domains = _available_domains(hass)
+    all_available_entities = hass.states.async_entity_ids()
+    
+    # Build blocked and allowed lists
+    blocked_domains = []
+    blocked_entities = []
+    blocked_services = []
+    allowed_domains = []
+    allowed_entities = []
+    
+    # Process domains
+    for domain in all_available_domains:
+        domain_blocked = False
+        domain_services = []
+        domain_allowed = False
+        
+        # Check user-specific restrictions first (highest priority)
+        if domain in user_domains:
+            user_domain_config = user_domains[domain]
+            if isinstance(user_domain_config, dict):
+                user_services = user_domain_config.get("services", [])
+                domain_allowed = user_domain_config.get("allow", False)
+                if domain_allowed:
+                    # User explicitly allows this domain
+                    allowed_domains.append(domain)
+                    continue
+                if not user_services:  # Empty list means block all
+                    domain_blocked = True
+                else:
+                    domain_services = user_services
+            else:
+                domain_blocked = True  # Non-dict means block all
+        
+        # Check role-specific permissions (medium priority)
+        elif domain in role_domains:
+            role_domain_config = role_domains[domain]
+            if isinstance(role_domain_config, dict):
+                role_services = role_domain_config.get("services", [])
+                domain_allowed = role_domain_config.get("allow", False)
+                if domain_allowed:
+                    # Role explicitly allows this domain
+                    allowed_domains.append(domain)
+                    continue
+                if not role_services:  # Empty list means block all
+                    domain_blocked = True
+                else:
+                    domain_services = role_services
+            else:
+                domain_blocked = True  # Non-dict means block all
+        
+        # Check default restrictions (lowest priority)
+        elif domain in default_domains:
+            default_domain_config = default_domains[domain]
+            if isinstance(default_domain_config, dict):
+                default_services = default_domain_config.get("services", [])
+                domain_allowed = default_domain_config.get("allow", False)
+                if domain_allowed:
+                    # Default explicitly allows this domain
+                    allowed_domains.append(domain)
+                    continue
+                if not default_services:  # Empty list means block all
+                    domain_blocked = True
+                else:
+                    domain_services = default_services
+            else:
+                domain_blocked = True  # Non-dict means block all
+        
+        # If no explicit configuration found, apply role's default behavior
+        else:
+            if not role_allows_by_default:
+                # Role denies by default, so block this domain
+                domain_blocked = True
+            # If role allows by default, don't block (domain_allowed remains False)
+        
+        if domain_blocked:
+            blocked_domains.append(domain)
+        elif domain_services:
+            # Add specific services to blocked services list
+            for service in domain_services:
+                blocked_services.append(f"{domain}.{service}")
+    
+    # Process entities
+    for entity in all_available_entities:
+        entity_blocked = False
+        entity_services = []
+        entity_allowed = False
+        
+        # Check user-specific restrictions first (highest priority)
+        if entity in user_entities:
+            user_entity_config = user_entities[entity]
+            if isinstance(user_entity_config, dict):
+                user_services = user_entity_config.get("services", [])
+                entity_allowed = user_entity_config.get("allow", False)
+                if entity_allowed:
+                    # User explicitly allows this entity
+                    allowed_entities.append(entity)
+                    continue
+                if not user_services:  # Empty list means block all
+                    entity_blocked = True
+                else:
+                    entity_services = user_services
+            else:
+                entity_blocked = True  # Non-dict means block all
+        
+        # Check role-specific permissions (medium priority)
+        elif entity in role_entities:
+            role_entity_config = role_entities[entity]
+            if isinstance(role_entity_config, dict):
+                role_services = role_entity_config.get("services", [])
+                entity_allowed = role_entity_config.get("allow", False)
+                if entity_allowed:
+                    # Role explicitly allows this entity
+                    allowed_entities.append(entity)
+                    continue
+                if not role_services:  # Empty list means block all
+                    entity_blocked = True
+                else:
+                    entity_services = role_services
+            else:
+                entity_blocked = True  # Non-dict means block all
+        
+        # Check default restrictions (lowest priority)
+        elif entity in default_entities:
+            default_entity_config = default_entities[entity]
+            if isinstance(default_entity_config, dict):
+                default_services = default_entity_config.get("services", [])
+                entity_allowed = default_entity_config.get("allow", False)
+                if entity_allowed:
+                    # Default explicitly allows this entity
+                    allowed_entities.append(entity)
+                    continue
+                if not default_services:  # Empty list means block all
+                    entity_blocked = True
+                else:
+                    entity_services = default_services
+            else:
+                entity_blocked = True  # Non-dict means block all
+        
+        # If no explicit configuration found, apply role's default behavior
+        else:
+            if not role_allows_by_default:
+                # Role denies by default, so block this entity
+                entity_blocked = True
+            # If role allows by default, don't block (entity_allowed remains False)
+        
+        if entity_blocked:
+            blocked_entities.append(entity)
+        elif entity_services:
+            # Add specific services to blocked services list
+            for service in entity_services:
+                blocked_services.append(f"{entity}.{service}")
+    
+    return {
+        "enabled": True,
+        "domains": blocked_domains,
+        "entities": blocked_entities,
+        "services": blocked_services,
+        "allowed_domains": allowed_domains,
+        "allowed_entities": allowed_entities
+    }
+
+
 class RBACFrontendBlockingView(HomeAssistantView):
     """View to get frontend blocking configuration for current user."""
     
@@ -1011,329 +1498,33 @@ class RBACFrontendBlockingView(HomeAssistantView):
         try:
             hass = request.app["hass"]
             user = request["hass_user"]
-            
-            # Get access control configuration
-            access_config = hass.data.get(DOMAIN, {}).get("access_config", {})
-            
-            rbac_enabled = access_config.get("enabled", True)
-            frontend_blocking_enabled = access_config.get("frontend_blocking_enabled", True)
-            
-            if not rbac_enabled or not frontend_blocking_enabled:
-                return self.json({
-                    "enabled": False,
-                    "domains": [],
-                    "entities": [],
-                    "services": []
-                })
-            
-            # Get user configuration
-            users = access_config.get("users", {})
-            user_config = users.get(user.id)
-            
-            if not user_config:
-                # User not in config, return empty blocking (full access)
-                return self.json({
-                    "enabled": True,
-                    "domains": [],
-                    "entities": [],
-                    "services": []
-                })
-            
-            # Get user role
-            user_role = user_config.get("role", "user")
-            roles = access_config.get("roles", {})
-            role_config = roles.get(user_role, {})
-            
-            # Check if user has admin role (bypasses restrictions)
-            if role_config.get("admin", False):
-                return self.json({
-                    "enabled": True,
-                    "domains": [],
-                    "entities": [],
-                    "services": []
-                })
-            
-            # Check if role has deny_all enabled
-            deny_all = role_config.get("deny_all", False)
-            if deny_all:
-                # In deny_all mode, we need to get all available domains/entities
-                # and only allow those explicitly marked with allow: true
-                hass = request.app["hass"]
-                
-                # Get all available domains and entities
-                all_available_domains = set()
-                all_available_entities = set()
-                
-                # Get domains from all states
-                for state in hass.states.async_all():
-                    domain = state.entity_id.split('.')[0]
-                    all_available_domains.add(domain)
-                    all_available_entities.add(state.entity_id)
-                
-                # Get domains from services
-                for domain in hass.services.async_services():
-                    all_available_domains.add(domain)
-                
-                # Get role permissions to find allowed items
-                role_permissions = role_config.get("permissions", {})
-                role_domains = role_permissions.get("domains", {})
-                role_entities = role_permissions.get("entities", {})
-                
-                # Get user-specific restrictions
-                user_restrictions = user_config.get("restrictions", {})
-                user_domains = user_restrictions.get("domains", {})
-                user_entities = user_restrictions.get("entities", {})
-                
-                # Build blocked and allowed lists - block everything except explicitly allowed
-                blocked_domains = []
-                blocked_entities = []
-                blocked_services = []
-                allowed_domains = []
-                allowed_entities = []
-                
-                # Process domains - block all except those with allow: true
-                for domain in all_available_domains:
-                    domain_allowed = False
-                    
-                    # Check user-specific restrictions first
-                    if domain in user_domains:
-                        user_domain_config = user_domains[domain]
-                        if isinstance(user_domain_config, dict):
-                            domain_allowed = user_domain_config.get("allow", False)
-                    
-                    # Check role-specific permissions
-                    if not domain_allowed and domain in role_domains:
-                        role_domain_config = role_domains[domain]
-                        if isinstance(role_domain_config, dict):
-                            domain_allowed = role_domain_config.get("allow", False)
-                    
-                    if domain_allowed:
-                        allowed_domains.append(domain)
-                    else:
-                        blocked_domains.append(domain)
-                
-                # Process entities - block all except those with allow: true
-                for entity in all_available_entities:
-                    entity_allowed = False
-                    
-                    # Check user-specific restrictions first
-                    if entity in user_entities:
-                        user_entity_config = user_entities[entity]
-                        if isinstance(user_entity_config, dict):
-                            entity_allowed = user_entity_config.get("allow", False)
-                    
-                    # Check role-specific permissions
-                    if not entity_allowed and entity in role_entities:
-                        role_entity_config = role_entities[entity]
-                        if isinstance(role_entity_config, dict):
-                            entity_allowed = role_entity_config.get("allow", False)
-                    
-                    if entity_allowed:
-                        allowed_entities.append(entity)
-                    else:
-                        blocked_entities.append(entity)
-                
-                return self.json({
-                    "enabled": True,
-                    "domains": blocked_domains,
-                    "entities": blocked_entities,
-                    "services": blocked_services,
-                    "allowed_domains": allowed_domains,
-                    "allowed_entities": allowed_entities
-                })
-            
-            # Get default restrictions
-            default_restrictions = access_config.get("default_restrictions", {})
-            default_domains = default_restrictions.get("domains", {})
-            default_entities = default_restrictions.get("entities", {})
-            
-            # Get role-specific permissions
-            role_permissions = role_config.get("permissions", {})
-            role_domains = role_permissions.get("domains", {})
-            role_entities = role_permissions.get("entities", {})
-            
-            # Get user-specific restrictions
-            user_restrictions = user_config.get("restrictions", {})
-            user_domains = user_restrictions.get("domains", {})
-            user_entities = user_restrictions.get("entities", {})
-            
-            # Check if role allows by default (opposite of deny_all)
-            role_allows_by_default = not role_config.get("deny_all", False)
-            
-            # Get all available domains and entities from Home Assistant
-            all_available_domains = set()
-            all_available_entities = set()
-            
-            # Get domains from all states
-            for state in hass.states.async_all():
-                domain = state.entity_id.split('.')[0]
-                all_available_domains.add(domain)
-                all_available_entities.add(state.entity_id)
-            
-            # Get domains from services
-            for domain in hass.services.async_services():
-                all_available_domains.add(domain)
-            
-            # Build blocked and allowed lists
-            blocked_domains = []
-            blocked_entities = []
-            blocked_services = []
-            allowed_domains = []
-            allowed_entities = []
-            
-            # Process domains
-            for domain in all_available_domains:
-                domain_blocked = False
-                domain_services = []
-                domain_allowed = False
-                
-                # Check user-specific restrictions first (highest priority)
-                if domain in user_domains:
-                    user_domain_config = user_domains[domain]
-                    if isinstance(user_domain_config, dict):
-                        user_services = user_domain_config.get("services", [])
-                        domain_allowed = user_domain_config.get("allow", False)
-                        if domain_allowed:
-                            # User explicitly allows this domain
-                            allowed_domains.append(domain)
-                            continue
-                        if not user_services:  # Empty list means block all
-                            domain_blocked = True
-                        else:
-                            domain_services = user_services
-                    else:
-                        domain_blocked = True  # Non-dict means block all
-                
-                # Check role-specific permissions (medium priority)
-                elif domain in role_domains:
-                    role_domain_config = role_domains[domain]
-                    if isinstance(role_domain_config, dict):
-                        role_services = role_domain_config.get("services", [])
-                        domain_allowed = role_domain_config.get("allow", False)
-                        if domain_allowed:
-                            # Role explicitly allows this domain
-                            allowed_domains.append(domain)
-                            continue
-                        if not role_services:  # Empty list means block all
-                            domain_blocked = True
-                        else:
-                            domain_services = role_services
-                    else:
-                        domain_blocked = True  # Non-dict means block all
-                
-                # Check default restrictions (lowest priority)
-                elif domain in default_domains:
-                    default_domain_config = default_domains[domain]
-                    if isinstance(default_domain_config, dict):
-                        default_services = default_domain_config.get("services", [])
-                        domain_allowed = default_domain_config.get("allow", False)
-                        if domain_allowed:
-                            # Default explicitly allows this domain
-                            allowed_domains.append(domain)
-                            continue
-                        if not default_services:  # Empty list means block all
-                            domain_blocked = True
-                        else:
-                            domain_services = default_services
-                    else:
-                        domain_blocked = True  # Non-dict means block all
-                
-                # If no explicit configuration found, apply role's default behavior
-                else:
-                    if not role_allows_by_default:
-                        # Role denies by default, so block this domain
-                        domain_blocked = True
-                    # If role allows by default, don't block (domain_allowed remains False)
-                
-                if domain_blocked:
-                    blocked_domains.append(domain)
-                elif domain_services:
-                    # Add specific services to blocked services list
-                    for service in domain_services:
-                        blocked_services.append(f"{domain}.{service}")
-            
-            # Process entities
-            for entity in all_available_entities:
-                entity_blocked = False
-                entity_services = []
-                entity_allowed = False
-                
-                # Check user-specific restrictions first (highest priority)
-                if entity in user_entities:
-                    user_entity_config = user_entities[entity]
-                    if isinstance(user_entity_config, dict):
-                        user_services = user_entity_config.get("services", [])
-                        entity_allowed = user_entity_config.get("allow", False)
-                        if entity_allowed:
-                            # User explicitly allows this entity
-                            allowed_entities.append(entity)
-                            continue
-                        if not user_services:  # Empty list means block all
-                            entity_blocked = True
-                        else:
-                            entity_services = user_services
-                    else:
-                        entity_blocked = True  # Non-dict means block all
-                
-                # Check role-specific permissions (medium priority)
-                elif entity in role_entities:
-                    role_entity_config = role_entities[entity]
-                    if isinstance(role_entity_config, dict):
-                        role_services = role_entity_config.get("services", [])
-                        entity_allowed = role_entity_config.get("allow", False)
-                        if entity_allowed:
-                            # Role explicitly allows this entity
-                            allowed_entities.append(entity)
-                            continue
-                        if not role_services:  # Empty list means block all
-                            entity_blocked = True
-                        else:
-                            entity_services = role_services
-                    else:
-                        entity_blocked = True  # Non-dict means block all
-                
-                # Check default restrictions (lowest priority)
-                elif entity in default_entities:
-                    default_entity_config = default_entities[entity]
-                    if isinstance(default_entity_config, dict):
-                        default_services = default_entity_config.get("services", [])
-                        entity_allowed = default_entity_config.get("allow", False)
-                        if entity_allowed:
-                            # Default explicitly allows this entity
-                            allowed_entities.append(entity)
-                            continue
-                        if not default_services:  # Empty list means block all
-                            entity_blocked = True
-                        else:
-                            entity_services = default_services
-                    else:
-                        entity_blocked = True  # Non-dict means block all
-                
-                # If no explicit configuration found, apply role's default behavior
-                else:
-                    if not role_allows_by_default:
-                        # Role denies by default, so block this entity
-                        entity_blocked = True
-                    # If role allows by default, don't block (entity_allowed remains False)
-                
-                if entity_blocked:
-                    blocked_entities.append(entity)
-                elif entity_services:
-                    # Add specific services to blocked services list
-                    for service in entity_services:
-                        blocked_services.append(f"{entity}.{service}")
-            
-            return self.json({
-                "enabled": True,
-                "domains": blocked_domains,
-                "entities": blocked_entities,
-                "services": blocked_services,
-                "allowed_domains": allowed_domains,
-                "allowed_entities": allowed_entities
-            })
+            domain_data = hass.data.get(DOMAIN, _EMPTY)
+            
+            # The result only depends on the configuration and on which entities
+            # and services exist, so it is encoded once per user for each
+            # combination of those versions
+            generations = domain_data.get("listing_generations", _EMPTY)
+            version = (
+                domain_data.get("config_version", 0),
+                generations.get("entities", 0),
+                generations.get("services", 0),
+            )
+            cached = domain_data.get("frontend_blocking_cache")
+            if cached is None or cached[0] != version:
+                cached = (version, {})
+                if DOMAIN in hass.data:
+                    domain_data["frontend_blocking_cache"] = cached
+            
+            body = cached[1].get(user.id)
+            if body is None:
+                access_config = domain_data.get("access_config", _EMPTY)
+                body = cached[1][user.id] = json_bytes(
+                    _build_frontend_blocking(hass, access_config, user.id)
+                )
+            return _json_bytes_response(body)
             
         except Exception as e:
-            _LOGGER.error(f"Error getting frontend blocking config: {e}")
+            _LOGGER.error("Error getting frontend blocking config: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
@@ -1348,18 +1539,34 @@ class RBACYamlEditorView(HomeAssistantView):
         """Get the current access_control.yaml content."""
         try:
             hass = request.app["hass"]
+            domain_data = hass.data.setdefault(DOMAIN, {})
+            
+            # Reuse the rendered content while the file is unchanged on disk; the
+            # size catches edits within the mtime resolution
+            try:
+                stat = await hass.async_add_executor_job(
+                    os.stat, _access_control_config_path(hass)
+                )
+                file_key = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                file_key = None
+            cached = domain_data.get("yaml_editor_cache")
+            if file_key is not None and cached and cached[0] == file_key:
+                return self.json({"yaml_content": cached[1]})
             
             # Load configuration directly from the YAML file
             from . import _load_access_control_config
             access_config = await _load_access_control_config(hass)
             
-            # Convert to YAML string
-            yaml_content = yaml.dump(access_config, default_flow_style=False, indent=2, sort_keys=False)
+            # Convert to YAML string; the config was just loaded, so nothing else
+            # holds it while the executor dumps it
+            yaml_content = await hass.async_add_executor_job(_dump_yaml, access_config)
+            domain_data["yaml_editor_cache"] = (file_key, yaml_content)
             
             return self.json({"yaml_content": yaml_content})
             
         except Exception as e:
-            _LOGGER.error(f"Error getting YAML content: {e}")
+            _LOGGER.error("Error getting YAML content: %s", e)
             return self.json({"error": str(e)}, status_code=500)
     
     async def post(self, request):
@@ -1374,9 +1581,9 @@ class RBACYamlEditorView(HomeAssistantView):
             
             # Validate YAML syntax
             try:
-                parsed_config = yaml.safe_load(yaml_content)
+                parsed_config = await hass.async_add_executor_job(yaml.load, yaml_content, _YAMLLoader)
             except yaml.YAMLError as e:
-                return self.json({"error": f"Invalid YAML syntax: {str(e)}"}, status_code=400)
+                return self.json({"error": f"Invalid YAML syntax: {e}"}, status_code=400)
             
             # Basic validation of the structure
             if not isinstance(parsed_config, dict):
@@ -1397,23 +1604,29 @@ class RBACYamlEditorView(HomeAssistantView):
                 return self.json({"error": "users must be a dictionary"}, status_code=400)
             
             # Validate role names (alphanumeric and underscores only)
-            for role_name in parsed_config["roles"].keys():
+            for role_name in parsed_config["roles"]:
                 if not isinstance(role_name, str) or not role_name.replace("_", "").replace("-", "").isalnum():
                     return self.json({"error": f"Invalid role name '{role_name}': must contain only letters, numbers, underscores, and hyphens"}, status_code=400)
             
-            # Save the configuration
+            try:
+                _normalize_access_config(parsed_config)
+            except ValueError as e:
+                return self.json({"error": f"Invalid configuration: {e}"}, status_code=400)
+            
+            # Save the configuration; even a failed write may have touched the file
+            hass.data.setdefault(DOMAIN, {}).pop("yaml_editor_cache", None)
             from . import _save_access_control_config
             success = await _save_access_control_config(hass, parsed_config)
             
             if success:
                 # Update the in-memory configuration
-                hass.data[DOMAIN]["access_config"] = parsed_config
+                _set_access_config(hass, parsed_config)
                 return self.json({"success": True, "message": "YAML configuration updated successfully"})
             else:
                 return self.json({"error": "Failed to save YAML configuration"}, status_code=500)
                 
         except Exception as e:
-            _LOGGER.error(f"Error updating YAML content: {e}")
+            _LOGGER.error("Error updating YAML content: %s", e)
             return self.json({"error": str(e)}, status_code=500)
 
 
@@ -1469,7 +1682,7 @@ class RBACStaticView(HomeAssistantView):
             return web.Response(body=content, headers=headers)
             
         except Exception as e:
-            _LOGGER.error(f"Error serving static file {file_path}: {e}")
+            _LOGGER.error("Error serving static file %s: %s", file_path, e)
             return web.Response(status=500, text="Internal server error")
 
 
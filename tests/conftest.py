@@ -0,0 +1,8 @@
+"""Fixtures for RBAC tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable loading the RBAC custom integration in every test."""
+    return
@@ -0,0 +1,91 @@
+"""Smoke tests for the RBAC config, listing and frontend blocking views."""
+from http import HTTPStatus
+import sys
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.rbac import DOMAIN, _set_access_config
+
+
+@pytest.fixture
+async def rbac_client(hass: HomeAssistant, hass_client):
+    """Set up RBAC with a light entity and return an authenticated client."""
+    hass.states.async_set("light.kitchen", "on")
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return await hass_client()
+
+
+def _assign_role(hass: HomeAssistant, user_id: str, role: str, role_config: dict) -> None:
+    """Give the test user a role, turn on frontend blocking and publish the change."""
+    access_config = dict(hass.data[DOMAIN]["access_config"])
+    access_config["frontend_blocking_enabled"] = True
+    access_config["roles"] = {**access_config.get("roles", {}), role: role_config}
+    access_config["users"] = {**access_config.get("users", {}), user_id: {"role": role}}
+    _set_access_config(hass, access_config)
+
+
+async def test_domains_view(hass: HomeAssistant, rbac_client) -> None:
+    """The domains listing includes entity and service domains."""
+    resp = await rbac_client.get("/api/rbac/domains")
+    assert resp.status == HTTPStatus.OK
+    domains = await resp.json()
+    assert "light" in domains
+    assert DOMAIN in domains
+    assert domains == sorted(domains)
+
+
+async def test_services_view(hass: HomeAssistant, rbac_client) -> None:
+    """The services listing maps entities to their domain's services."""
+    hass.services.async_register("light", "turn_on", lambda call: None)
+    resp = await rbac_client.get("/api/rbac/services")
+    assert resp.status == HTTPStatus.OK
+    data = await resp.json()
+    assert data["domains"]["light"] == ["turn_on"]
+    assert data["entities"]["light.kitchen"] == ["turn_on"]
+
+
+@pytest.mark.parametrize(
+    ("role_config", "blocked_key", "allowed_key"),
+    [
+        ({"deny_all": True}, "domains", "allowed_domains"),
+        ({"permissions": {"domains": {"light": {"services": []}}}}, "domains", "allowed_domains"),
+    ],
+)
+async def test_frontend_blocking_view(
+    hass: HomeAssistant, hass_admin_user, rbac_client, role_config, blocked_key, allowed_key
+) -> None:
+    """Users with a configured role get their blocked domains resolved."""
+    _assign_role(hass, hass_admin_user.id, "restricted", role_config)
+
+    resp = await rbac_client.get("/api/rbac/frontend-blocking")
+    assert resp.status == HTTPStatus.OK
+    data = await resp.json()
+    assert data["enabled"] is True
+    assert "light" in data[blocked_key]
+    assert "light" not in data[allowed_key]
+
+    # A repeated request is served from the per-user cache
+    resp = await rbac_client.get("/api/rbac/frontend-blocking")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.json() == data
+
+
+async def test_config_view_interns_posted_role(
+    hass: HomeAssistant, hass_admin_user, rbac_client
+) -> None:
+    """Role names posted through the config view are interned like loaded ones."""
+    resp = await rbac_client.post(
+        "/api/rbac/config",
+        json={"action": "assign_user_role", "userId": hass_admin_user.id, "roleName": "guest"},
+    )
+    assert resp.status == HTTPStatus.OK
+
+    access_config = hass.data[DOMAIN]["access_config"]
+    role = access_config["users"][hass_admin_user.id]["role"]
+    assert role == "guest"
+    assert role is sys.intern(role)
+    assert next(name for name in access_config["roles"] if name == role) is role